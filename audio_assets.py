@@ -0,0 +1,84 @@
+import glob
+import hashlib
+import os
+import threading
+
+from pygame import mixer
+
+# 256 frames at 44.1 kHz is ~6 ms of buffering, against pygame's default of 512
+FREQUENCY = 44100
+BUFFER_SIZE = 256
+
+
+def configure_mixer(frequency=FREQUENCY, buffer=BUFFER_SIZE):
+    """Ask for a small mixer buffer; must run before pygame.init() / mixer.init()."""
+    mixer.pre_init(frequency=frequency, size=-16, channels=2, buffer=buffer)
+
+
+def load_sound(path, cache_dir=None):
+    """``mixer.Sound`` for ``path``, from cached PCM when possible.
+
+    Decoded samples are kept in ``sfx/.cache`` under a name made of the source
+    file's SHA-1 and the mixer format. A changed MP3 or mixer setup just misses
+    the cache and is decoded again.
+    """
+    frequency, size, channels = mixer.get_init()
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path), '.cache')
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}-{digest}-{frequency}-{size}-{channels}.pcm")
+
+    try:
+        with open(cache_path, 'rb') as f:
+            return mixer.Sound(buffer=f.read())
+    except FileNotFoundError:
+        pass
+
+    sound = mixer.Sound(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, f"{name}-*.pcm")):
+            os.remove(stale)
+        with open(cache_path + '.tmp', 'wb') as f:
+            f.write(sound.get_raw())
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError as e:
+        print(f"Could not cache decoded {path}:", e)
+    return sound
+
+
+class SoundBank:
+    """Sound effects loaded on a background thread, each with its own reserved channel.
+
+    Loading goes through the PCM cache, so only the first launch after a change
+    pays for MP3 decoding, and the game never waits for it either way: playing
+    a sound that isn't ready yet does nothing. Every sound gets a dedicated
+    channel reserved up front, so sounds never steal each other's channel and
+    nothing is allocated mid-game.
+    """
+
+    def __init__(self, paths, cache_dir=None):
+        self.paths = paths
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.channels = {}
+        self.thread = None
+
+    def load_async(self):
+        if self.thread is not None:
+            return
+        mixer.set_num_channels(max(mixer.get_num_channels(), len(self.paths) + 4))
+        mixer.set_reserved(len(self.paths))
+        self.channels = {name: mixer.Channel(i) for i, name in enumerate(self.paths)}
+        self.thread = threading.Thread(target=self._load, daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        for name, path in self.paths.items():
+            self.sounds[name] = load_sound(path, self.cache_dir)
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is not None:
+            self.channels[name].play(sound)
@@ -0,0 +1,53 @@
+"""Compare the maze generators' speed and memory across maze sizes.
+
+    python bench_generators.py
+    python bench_generators.py --sizes 100 1000 --generators kruskal eller
+
+Time is the best of ``--repeat`` runs; peak memory is measured separately
+with tracemalloc, which slows the generators down.
+"""
+import argparse
+import time
+import tracemalloc
+
+from maze_generators import GENERATORS, generate
+
+
+def time_generator(name, size, seed, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generate(name, size, size, seed)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(name, size, seed):
+    tracemalloc.start()
+    try:
+        generate(name, size, size, seed)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 500],
+                        help="Side lengths of the square mazes to generate")
+    parser.add_argument('--generators', nargs='+', choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'generator':<12} {'size':>11} {'time':>10} {'cells/s':>12} {'peak mem':>10}")
+    for size in args.sizes:
+        for name in args.generators:
+            seconds = time_generator(name, size, args.seed, args.repeat)
+            peak = peak_memory(name, size, args.seed)
+            print(f"{name:<12} {f'{size}x{size}':>11} {seconds * 1000:>8.1f}ms "
+                  f"{size * size / seconds:>12,.0f} {peak / 2**20:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
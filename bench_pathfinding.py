@@ -0,0 +1,77 @@
+"""Compare the path finders on mazes of increasing size.
+
+    python bench_pathfinding.py
+    python bench_pathfinding.py --sizes 1000 2000 --queries 5 --batch 10000
+
+Single-query searches are timed per query between random pairs of cells;
+the batch solver is timed for ``--batch`` queries, both for whole paths and
+for distances alone, with its one-off setup shown separately.
+Every finder's path lengths are checked against each other.
+"""
+import argparse
+import random
+import time
+
+from maze_generators import GENERATORS, generate
+from pathfinding import BatchSolver, astar, bfs, bidirectional
+
+FINDERS = {'bfs': bfs, 'astar': astar, 'bidirectional': bidirectional}
+
+
+def random_queries(rng, cols, rows, count):
+    return [((rng.randrange(cols), rng.randrange(rows)), (rng.randrange(cols), rng.randrange(rows)))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 316, 1000],
+                        help="Side lengths of the square mazes (1000 is a million cells)")
+    parser.add_argument('--generator', choices=list(GENERATORS), default='backtracker')
+    parser.add_argument('--queries', type=int, default=10, help="Queries per single-query finder")
+    parser.add_argument('--batch', type=int, default=200, help="Queries for the batch solver")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'size':>11} {'finder':<14} {'per query':>12} {'path':>8}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        maze = generate(args.generator, size, size, args.seed)
+        print(f"{f'{size}x{size}':>11} {'(generate)':<14} {(time.perf_counter() - start) * 1000:>10.1f}ms")
+
+        queries = random_queries(rng, size, size, args.queries)
+        lengths = None
+        for name, finder in FINDERS.items():
+            start = time.perf_counter()
+            found = [len(finder(maze, a, b)) for a, b in queries]
+            per_query = (time.perf_counter() - start) / len(queries)
+            if lengths is not None and found != lengths:
+                raise AssertionError(f"{name} disagrees with bfs on path lengths")
+            lengths = found
+            print(f"{'':>11} {name:<14} {per_query * 1000:>10.2f}ms {sum(found) / len(found):>8.0f}")
+
+        batch = queries + random_queries(rng, size, size, args.batch - len(queries))
+        start = time.perf_counter()
+        solver = BatchSolver(maze)
+        setup = time.perf_counter() - start
+        print(f"{'':>11} {'(batch setup)':<14} {setup * 1000:>10.1f}ms"
+              f"   ({'tree' if solver.perfect else 'distance fields'})")
+
+        start = time.perf_counter()
+        found = [len(path) for path in solver.paths(batch)]
+        per_query = (time.perf_counter() - start) / len(batch)
+        if found[:len(queries)] != lengths:
+            raise AssertionError("batch solver disagrees with bfs on path lengths")
+        print(f"{'':>11} {'batch paths':<14} {per_query * 1000:>10.2f}ms {sum(found) / len(found):>8.0f}")
+
+        start = time.perf_counter()
+        distances = [solver.distance(a, b) for a, b in batch]
+        per_query = (time.perf_counter() - start) / len(batch)
+        if [steps + 1 for steps in distances] != found:
+            raise AssertionError("batch distances disagree with batch paths")
+        print(f"{'':>11} {'batch distance':<14} {per_query * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
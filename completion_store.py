@@ -0,0 +1,112 @@
+"""Binary store of completion times: a fixed header followed by a float64 array.
+
+    python completion_store.py import completion_times.tex
+    python completion_store.py export completion_times.tex
+
+The header records how many times are committed. Appending writes the new
+value past the end and then bumps the count, so an append costs the same
+however many runs are stored, and loading is a read-only memory map.
+"""
+import argparse
+import os
+import struct
+
+import numpy as np
+
+STORE_PATH = "completion_times.bin"
+TEX_PATH = "completion_times.tex"
+
+MAGIC = b"MZCT"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")  # magic, version, count
+VALUE = struct.Struct("<d")
+
+
+def _read_tex(tex_path):
+    times = []
+    with open(tex_path, "r") as f:
+        for line in f:
+            try:
+                times.append(float(line.strip()))
+            except ValueError:
+                continue
+    return times
+
+
+class CompletionStore:
+    def __init__(self, path=STORE_PATH, legacy_tex=TEX_PATH):
+        self.path = path
+        self.legacy_tex = legacy_tex
+
+    def _ensure(self):
+        """Create the store on first use, importing the old text file if there is one."""
+        if os.path.exists(self.path):
+            return
+        times = []
+        if self.legacy_tex and os.path.exists(self.legacy_tex):
+            times = _read_tex(self.legacy_tex)
+        # Built aside and renamed into place, so an interrupted import is retried next time
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(times)))
+            f.write(np.asarray(times, dtype="<f8").tobytes())
+        os.replace(temp_path, self.path)
+
+    def _read_count(self, f):
+        magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} completion time store")
+        return count
+
+    def __len__(self):
+        self._ensure()
+        with open(self.path, "rb") as f:
+            return self._read_count(f)
+
+    def extend(self, times_seconds):
+        self._ensure()
+        data = np.asarray(times_seconds, dtype="<f8").tobytes()
+        with open(self.path, "r+b") as f:
+            count = self._read_count(f)
+            f.seek(HEADER.size + count * VALUE.size)
+            f.write(data)
+            f.flush()
+            # Only commit the new count once the values are written
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, count + len(data) // VALUE.size))
+
+    def append(self, time_seconds):
+        self.extend([time_seconds])
+
+    def load(self):
+        """All stored times as a read-only array mapped straight from the file."""
+        count = len(self)
+        if count == 0:
+            return np.empty(0, dtype="<f8")
+        return np.memmap(self.path, dtype="<f8", mode="r", offset=HEADER.size, shape=(count,))
+
+    def import_tex(self, tex_path):
+        """Append the times from a text file with one value per line, skipping bad lines."""
+        times = _read_tex(tex_path)
+        self.extend(times)
+        return len(times)
+
+    def export_tex(self, tex_path):
+        times = self.load()
+        with open(tex_path, "w") as f:
+            f.writelines(f"{float(t)}\n" for t in times)
+        return len(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import or export completion times as text.")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("tex_path", nargs="?", default=TEX_PATH)
+    parser.add_argument("--store", default=STORE_PATH)
+    args = parser.parse_args()
+
+    store = CompletionStore(args.store, legacy_tex=None)
+    if args.action == "import":
+        print(f"Imported {store.import_tex(args.tex_path)} times into {args.store}")
+    else:
+        print(f"Exported {store.export_tex(args.tex_path)} times to {args.tex_path}")
@@ -0,0 +1,82 @@
+"""Direction events from the pose controller to the maze game over a local datagram socket.
+
+Each datagram carries an event id, the sender's ``time.monotonic_ns()`` and the
+direction. The monotonic clock is shared by processes on the same machine, so
+the receiver can tell how old each event is. A Unix domain socket is used
+where available, and UDP on localhost otherwise.
+"""
+import os
+import socket
+import struct
+import tempfile
+import time
+from collections import namedtuple
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "maze_directions.sock")
+UDP_ADDRESS = ("127.0.0.1", 47474)
+
+DIRECTIONS = ('LEFT', 'RIGHT', 'UP', 'DOWN')
+MESSAGE = struct.Struct("<IqB")  # event id, monotonic send time (ns), index into DIRECTIONS
+
+DirectionEvent = namedtuple("DirectionEvent", "event_id direction sent_ns received_ns")
+
+
+def _open_socket(path):
+    if hasattr(socket, "AF_UNIX"):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM), path
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM), UDP_ADDRESS
+
+
+class DirectionSender:
+    def __init__(self, path=SOCKET_PATH):
+        self.sock, self.address = _open_socket(path)
+        self.sock.setblocking(False)
+        self.next_id = 0
+        self.dropped = 0
+
+    def send(self, direction, event_id=None):
+        """Send ``direction`` without blocking and return its event id.
+
+        Events are dropped, and counted in ``dropped``, on any send error, such
+        as the game not listening or its socket buffer being full (ENOBUFS on
+        macOS); a stale direction is no use to the player anyway.
+        """
+        if event_id is None:
+            event_id = self.next_id
+            self.next_id += 1
+        message = MESSAGE.pack(event_id & 0xFFFFFFFF, time.monotonic_ns(), DIRECTIONS.index(direction))
+        try:
+            self.sock.sendto(message, self.address)
+        except OSError:
+            self.dropped += 1
+        return event_id
+
+    def close(self):
+        self.sock.close()
+
+
+class DirectionReceiver:
+    def __init__(self, path=SOCKET_PATH):
+        self.sock, self.address = _open_socket(path)
+        if self.sock.family == getattr(socket, "AF_UNIX", None) and os.path.exists(path):
+            os.unlink(path)  # Left behind by a game that didn't shut down cleanly
+        self.sock.bind(self.address)
+        self.sock.setblocking(False)
+
+    def poll(self):
+        """All events received since the last call, oldest first."""
+        events = []
+        while True:
+            try:
+                message = self.sock.recv(MESSAGE.size)
+            except BlockingIOError:
+                return events
+            if len(message) != MESSAGE.size:
+                continue
+            event_id, sent_ns, direction = MESSAGE.unpack(message)
+            events.append(DirectionEvent(event_id, DIRECTIONS[direction], sent_ns, time.monotonic_ns()))
+
+    def close(self):
+        self.sock.close()
+        if self.sock.family == getattr(socket, "AF_UNIX", None) and os.path.exists(self.address):
+            os.unlink(self.address)
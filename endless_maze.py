@@ -0,0 +1,254 @@
+"""Endless mode: a maze that keeps growing downwards as the player descends.
+
+    python maze_game.py --endless
+
+The maze is as wide as the screen and generated a chunk of rows at a time
+with Eller's algorithm. Each chunk is a complete maze of its own, joined to
+the one above through a single opening, so chunks far enough behind the
+player can be dropped without cutting the way forward; memory and per-frame
+work stay the same however deep the player gets.
+"""
+import random
+from collections import deque
+
+import numpy as np
+import pygame
+
+from maze_array import ALL_WALLS, BOTTOM, TOP, MazeGrid
+from maze_generators import EllerRows
+from maze_renderer import PathOverlay, draw_walls
+from wall_index import WallIndex
+
+CHUNK_ROWS = 8
+
+
+class MazeChunk:
+    """``rows`` rows of the maze starting at world row ``first_row``, with its own wall index."""
+
+    def __init__(self, first_row, grid, tile, thickness):
+        self.first_row = first_row
+        self.grid = grid
+        self.tile = tile
+        self.thickness = thickness
+        self.wall_index = WallIndex(grid, tile, thickness)
+        self.surface = None  # Drawn when the chunk first comes into view
+
+    @property
+    def top(self):
+        return self.first_row * self.tile
+
+    @property
+    def bottom(self):
+        return (self.first_row + self.grid.rows) * self.tile
+
+    def seal_top(self):
+        """Close the passages into the chunk above, once that chunk is evicted."""
+        self.grid.walls[0] |= TOP
+        self.wall_index = WallIndex(self.grid, self.tile, self.thickness)
+        self.surface = None
+
+    def collides(self, rect):
+        return self.wall_index.collides(rect.move(0, -self.top))
+
+    def render(self):
+        if self.surface is None:
+            self.surface = pygame.Surface((self.grid.cols * self.tile, self.grid.rows * self.tile)).convert()
+            self.surface.fill(pygame.Color('black'))
+            draw_walls(self.surface, self.grid, self.tile, self.thickness)
+        return self.surface
+
+
+class EndlessMaze:
+    """The loaded window of an endless maze: a deque of chunks from ``first_row`` to ``end_row``.
+
+    ``update()`` generates chunks until both the goal row and ``ahead`` chunks
+    past the player are loaded, and evicts chunks more than ``behind`` chunks
+    above the player. ``grid`` is the whole window as one MazeGrid, for path finding.
+    """
+
+    def __init__(self, cols, tile, thickness, seed=None, chunk_rows=CHUNK_ROWS, behind=1, ahead=1):
+        self.cols = cols
+        self.tile = tile
+        self.thickness = thickness
+        self.chunk_rows = chunk_rows
+        self.behind = behind
+        self.ahead = ahead
+        self.rng = random.Random(seed)
+        self.chunks = deque()
+        self.end_row = 0
+        self.opening = 0  # Column where the next chunk joins the last one
+        self.grid = None
+
+    @property
+    def first_row(self):
+        return self.chunks[0].first_row
+
+    def _add_chunk(self):
+        eller = EllerRows(self.cols, self.rng)
+        walls = bytearray().join(eller.next_row(last=y == self.chunk_rows - 1) for y in range(self.chunk_rows))
+        if self.chunks:
+            walls[self.opening] &= ALL_WALLS ^ TOP
+        self.opening = self.rng.randrange(self.cols)
+        walls[-self.cols + self.opening] &= ALL_WALLS ^ BOTTOM
+        grid = MazeGrid(self.cols, self.chunk_rows,
+                        np.frombuffer(walls, dtype=np.uint8).reshape(self.chunk_rows, self.cols))
+        self.chunks.append(MazeChunk(self.end_row, grid, self.tile, self.thickness))
+        self.end_row += self.chunk_rows
+
+    def update(self, player_row, goal_row=0):
+        """Load and evict chunks around ``player_row``; returns True if the window changed."""
+        changed = False
+        while self.end_row <= max(goal_row, player_row + self.ahead * self.chunk_rows):
+            self._add_chunk()
+            changed = True
+        while self.chunks[0].first_row + self.chunk_rows <= player_row - self.behind * self.chunk_rows:
+            self.chunks.popleft()
+            self.chunks[0].seal_top()
+            changed = True
+        if changed:
+            walls = np.concatenate([chunk.grid.walls for chunk in self.chunks])
+            walls[-1] |= BOTTOM  # Close the opening onto the chunk not generated yet
+            self.grid = MazeGrid(self.cols, len(walls), walls)
+        return changed
+
+    def local_index(self, x, row):
+        """Index into ``grid`` of the cell at column ``x`` and world row ``row``."""
+        return x + (row - self.first_row) * self.cols
+
+    def collides(self, rect):
+        return any(chunk.collides(rect) for chunk in self.chunks
+                   if chunk.top < rect.bottom and rect.top < chunk.bottom)
+
+    def visible_chunks(self, top, bottom):
+        """Chunks overlapping world pixel rows ``top`` to ``bottom``; the rest give up their surfaces."""
+        visible = []
+        for chunk in self.chunks:
+            if chunk.top < bottom and top < chunk.bottom:
+                visible.append(chunk)
+            else:
+                chunk.surface = None
+        return visible
+
+
+class EndlessGame:
+    """Player, goal and scoring on top of an EndlessMaze, all in world pixel coordinates.
+
+    Each goal is placed ``goal_start`` rows below the player, plus ``goal_step``
+    more for every goal already reached, up to ``goal_max``.
+    """
+
+    def __init__(self, cols, tile, thickness, seed=None, goal_start=10, goal_step=4, goal_max=40):
+        self.tile = tile
+        self.goal_start = goal_start
+        self.goal_step = goal_step
+        self.goal_max = goal_max
+        self.rng = random.Random(seed)
+        self.maze = EndlessMaze(cols, tile, thickness, seed)
+        self.player_rect = pygame.Rect(tile // 2 - 15, tile // 2 - 15, 30, 30)
+        self.previous_topleft = self.player_rect.topleft
+        self.goals_reached = 0
+        self.goal = None
+        self.distance_field = None
+        self.route_overlay = PathOverlay(tile)
+        self.maze.update(0)
+        self._place_goal()
+
+    def player_cell(self):
+        return self.player_rect.centerx // self.tile, self.player_rect.centery // self.tile
+
+    def depth(self):
+        return self.player_cell()[1]
+
+    def _place_goal(self):
+        row = self.depth()
+        goal_row = row + min(self.goal_start + self.goals_reached * self.goal_step, self.goal_max)
+        self.maze.update(row, goal_row)
+        self.goal = (self.rng.randrange(self.maze.cols), goal_row)
+        self._update_distance_field()
+
+    def _update_distance_field(self):
+        goal_x, goal_row = self.goal
+        self.distance_field = self.maze.grid.distance_field((goal_x, goal_row - self.maze.first_row))
+
+    def goal_rect(self):
+        return pygame.Rect(self.goal[0] * self.tile, self.goal[1] * self.tile, self.tile, self.tile)
+
+    def move(self, move):
+        """Move the player by ``(dx, dy)`` unless a wall is in the way; returns True on reaching the goal."""
+        self.previous_topleft = self.player_rect.topleft
+        if move != (0, 0):
+            new_pos = self.player_rect.move(move)
+            if not self.maze.collides(new_pos):
+                self.player_rect = new_pos
+
+        if self.maze.update(self.depth(), self.goal[1]):
+            self._update_distance_field()
+
+        if self.player_rect.colliderect(self.goal_rect()):
+            self.goals_reached += 1
+            self._place_goal()
+            return True
+        return False
+
+    def next_direction(self):
+        index = self.maze.local_index(*self.player_cell())
+        hop = int(self.distance_field.next_hop[index])
+        if hop == -1:
+            return ""
+        return {
+            1: 'RIGHT',
+            -1: 'LEFT',
+            self.maze.cols: 'DOWN',
+            -self.maze.cols: 'UP'
+        }.get(hop - index, '')
+
+    def route(self, limit):
+        """The next ``limit`` cells ``(x, row)`` towards the goal."""
+        index = self.maze.local_index(*self.player_cell())
+        cells = []
+        while index != -1 and len(cells) < limit:
+            row, x = divmod(index, self.maze.cols)
+            cells.append((x, row + self.maze.first_row))
+            index = int(self.distance_field.next_hop[index])
+        return cells
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the maze, goal, route and player with the camera following the player.
+
+        The player is drawn ``alpha`` of the way through its last move.
+        """
+        tile = self.tile
+        width, height = screen.get_size()
+        (x0, y0), player = self.previous_topleft, self.player_rect.copy()
+        player.topleft = (round(x0 + (player.x - x0) * alpha), round(y0 + (player.y - y0) * alpha))
+        camera = max(player.centery - height // 2, self.maze.first_row * tile)
+
+        screen.fill(pygame.Color('black'))
+        for chunk in self.maze.visible_chunks(camera, camera + height):
+            screen.blit(chunk.render(), (0, chunk.top - camera))
+        pygame.draw.rect(screen, pygame.Color('red'), self.goal_rect().inflate(-20, -20).move(0, -camera))
+
+        self.route_overlay.draw(screen, (self.player_cell(), self.goal),
+                                lambda: self.route(height // tile + 4), offset=(0, -camera))
+
+        pygame.draw.rect(screen, pygame.Color('cyan'), player.move(0, -camera))
+
+
+class EndlessBot:
+    """Follows the route to each goal in turn, for headless runs of endless mode."""
+
+    def __init__(self, game):
+        self.game = game
+
+    def poll(self):
+        game = self.game
+        direction = game.next_direction()
+        x, row = game.player_cell()
+        center_x = x * game.tile + game.tile // 2
+        center_y = row * game.tile + game.tile // 2
+        # Line up with the middle of the cell before turning, or the player clips the corner
+        if direction in ('LEFT', 'RIGHT') and game.player_rect.centery != center_y:
+            return 'UP' if game.player_rect.centery > center_y else 'DOWN'
+        if direction in ('UP', 'DOWN') and game.player_rect.centerx != center_x:
+            return 'LEFT' if game.player_rect.centerx > center_x else 'RIGHT'
+        return direction or None
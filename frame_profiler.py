@@ -0,0 +1,126 @@
+"""Per-phase frame timings, cheap enough to leave on all the time.
+
+Each frame is split into phases with ``lap()``, which costs one
+``perf_counter_ns()`` call. The last ``history`` frames are kept in a ring
+buffer for the F3 overlay, and with an ``export_path`` every frame is also
+written out for offline analysis: a .csv is appended to each time the ring
+buffer fills, a .npy (one int64 nanosecond field per phase) is written on close.
+"""
+import time
+
+import numpy as np
+import pygame
+
+from hud import get_font
+
+
+class FrameProfiler:
+    def __init__(self, phases, history=600, export_path=None, refresh=30):
+        self.phases = tuple(phases)
+        self.columns = {phase: i for i, phase in enumerate(self.phases)}
+        self.samples = np.zeros((history, len(self.phases)), dtype=np.int64)
+        self.frames = 0
+        self.row = [0] * len(self.phases)
+        self.last_ns = 0
+        self.export_path = export_path
+        self._csv = None
+        self._chunks = []
+        if export_path is not None and export_path.endswith('.csv'):
+            self._csv = open(export_path, 'w')
+            self._csv.write(','.join(('frame',) + self.phases) + '\n')
+        self.show_overlay = False
+        self.refresh = refresh  # Frames between overlay updates, so the numbers stay readable
+        self._overlay = None
+
+    def begin(self):
+        self.row = [0] * len(self.phases)
+        self.last_ns = time.perf_counter_ns()
+
+    def lap(self, phase):
+        """Charge the time since the last lap (or ``begin()``) to ``phase``."""
+        now = time.perf_counter_ns()
+        self.row[self.columns[phase]] += now - self.last_ns
+        self.last_ns = now
+
+    def end(self):
+        history = len(self.samples)
+        slot = self.frames % history
+        self.samples[slot] = self.row
+        self.frames += 1
+        if slot == history - 1:
+            self._export(self.samples)
+
+    def _export(self, rows):
+        if self.export_path is None or not len(rows):
+            return
+        if self._csv is not None:
+            first = self.frames - len(rows)
+            frame_numbers = np.arange(first, first + len(rows))
+            np.savetxt(self._csv, np.column_stack([frame_numbers, rows]), fmt='%d', delimiter=',')
+        else:
+            self._chunks.append(rows.copy())
+
+    def recent(self):
+        """The frames still in the ring buffer, oldest first, as an int64 ns array."""
+        history = len(self.samples)
+        if self.frames <= history:
+            return self.samples[:self.frames]
+        slot = self.frames % history
+        return np.concatenate([self.samples[slot:], self.samples[:slot]])
+
+    def stats(self):
+        """``{phase: (mean_ms, p99_ms)}`` over the recent frames, plus the whole frame as 'total'."""
+        recent = self.recent()
+        if not len(recent):
+            return {}
+        ms = np.column_stack([recent, recent.sum(axis=1)]) / 1e6
+        means = ms.mean(axis=0)
+        p99s = np.percentile(ms, 99, axis=0)
+        return {name: (means[i], p99s[i]) for i, name in enumerate(self.phases + ('total',))}
+
+    def summary(self):
+        return "\n".join(f"{name:<10} mean {mean:7.3f} ms   p99 {p99:7.3f} ms"
+                         for name, (mean, p99) in self.stats().items())
+
+    def _render_overlay(self):
+        # Rendered directly: these strings change every refresh and would evict the HUD's cached text
+        font = get_font('Courier New', 16)
+        lines = [font.render(f"{'phase':<9}{'mean':>7}{'p99':>8} ms", True, pygame.Color('white'))]
+        for name, (mean, p99) in self.stats().items():
+            lines.append(font.render(f"{name:<9}{mean:7.2f}{p99:8.2f}", True, pygame.Color('yellow')))
+        width = max(line.get_width() for line in lines) + 12
+        height = sum(line.get_height() for line in lines) + 12
+        overlay = pygame.Surface((width, height))
+        overlay.fill((20, 20, 20))
+        y = 6
+        for line in lines:
+            overlay.blit(line, (6, y))
+            y += line.get_height()
+        return overlay
+
+    def draw(self, screen, topright):
+        """Blit the overlay if it is switched on; returns the rect drawn, or None."""
+        if not self.show_overlay:
+            return None
+        if self._overlay is None or self.frames % self.refresh == 0:
+            self._overlay = self._render_overlay()
+        return screen.blit(self._overlay, self._overlay.get_rect(topright=topright))
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self._overlay = None
+
+    def close(self):
+        """Write out any frames not exported yet."""
+        if self.export_path is None:
+            return
+        self._export(self.samples[:self.frames % len(self.samples)])
+        if self._csv is not None:
+            self._csv.close()
+        else:
+            rows = np.concatenate(self._chunks) if self._chunks else np.empty((0, len(self.phases)), np.int64)
+            table = np.empty(len(rows), dtype=[(phase, '<i8') for phase in self.phases])
+            for phase, column in self.columns.items():
+                table[phase] = rows[:, column]
+            np.save(self.export_path, table)
+        self.export_path = None
@@ -2,6 +2,7 @@ import scipy
 import numpy as np
 import matplotlib.pyplot as plt
 
+from completion_store import CompletionStore
 
 FNAME = 'completion_times.tex'
 
@@ -26,6 +27,11 @@ def generate_fake_runtimes(num_runtimes=50):
 def save_runtimes_to_tex(runtimes, filename=FNAME):
     np.savetxt(filename, runtimes, fmt='%.2f', delimiter=',')
 
+def save_runtimes_to_store(runtimes, store=None):
+    """Append the runtimes to the completion time store the game reads."""
+    # Not through the legacy import too, or a new store would get them twice
+    (store or CompletionStore(legacy_tex=None)).extend(runtimes)
+
 def plot_runtimes(runtimes):
     plt.figure(figsize=(10, 6))
     plt.hist(runtimes, bins=20, color='blue', alpha=0.7)
@@ -37,6 +43,8 @@ def plot_runtimes(runtimes):
 if __name__ == "__main__":
     runtimes = generate_fake_runtimes()
     save_runtimes_to_tex(runtimes)
+    # The game only reads the .tex when it first creates the store
+    save_runtimes_to_store(runtimes)
     plot_runtimes(runtimes)
 
 
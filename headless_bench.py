@@ -0,0 +1,63 @@
+"""Run the maze game headless with a bot player and report frame timings.
+
+    python headless_bench.py --frames 2000
+    python headless_bench.py --games 20
+
+Uses SDL's dummy video and audio drivers, so it runs in CI or over ssh.
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+
+import maze_game
+from endless_maze import EndlessBot, EndlessGame
+from frame_profiler import FrameProfiler
+
+
+def summarise(frame_times, games_completed, wall_time):
+    ms = np.asarray(frame_times, dtype=np.float64) / 1e6
+    print(f"Frames:      {len(ms)} in {wall_time:.2f}s ({len(ms) / wall_time:.1f} fps)")
+    print(f"Games:       {games_completed} ({games_completed / wall_time:.2f} per second)")
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"Frame time:  mean {ms.mean():.3f} ms, p50 {p50:.3f} ms, "
+              f"p95 {p95:.3f} ms, p99 {p99:.3f} ms, max {ms.max():.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, help="Stop after this many frames")
+    parser.add_argument('--games', type=int, help="Stop after this many solved mazes (goals, with --endless)")
+    parser.add_argument('--fps', type=int, default=0, help="Frame cap (default: uncapped)")
+    parser.add_argument('--generator', choices=list(maze_game.GENERATORS), default=maze_game.GENERATOR,
+                        help="Maze generation algorithm")
+    parser.add_argument('--endless', action='store_true', help="Benchmark endless mode instead")
+    parser.add_argument('--profile', metavar='PATH', help="Also save per-phase frame timings to a .csv or .npy file")
+    args = parser.parse_args()
+    maze_game.GENERATOR = args.generator
+    if args.frames is None and args.games is None:
+        args.frames = 1000
+
+    start = time.perf_counter()
+    profiler = FrameProfiler(maze_game.PROFILE_PHASES, export_path=args.profile)
+    if args.endless:
+        game = EndlessGame(maze_game.cols, maze_game.TILE, maze_game.Cell.thickness, seed=0)
+        frame_times, games_completed = maze_game.main_endless(
+            input_source=EndlessBot(game), fps=args.fps,
+            max_frames=args.frames, max_goals=args.games, headless=True, profiler=profiler, game=game)
+    else:
+        frame_times, games_completed = maze_game.main(
+            input_source=maze_game.BotInput(), fps=args.fps,
+            max_frames=args.frames, max_games=args.games, headless=True, profiler=profiler)
+    summarise(frame_times, games_completed, time.perf_counter() - start)
+    print(f"Phases over the last {len(profiler.recent())} frames:")
+    print(profiler.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+from functools import lru_cache
+
+import pygame
+
+
+@lru_cache(maxsize=None)
+def get_font(name, size):
+    """Look up and load a system font once, instead of on every frame."""
+    return pygame.font.SysFont(name, size)
+
+
+class TextCache:
+    """Rendered text Surfaces memoised by (font, size, text, colour), with LRU eviction.
+
+    HUD strings such as "Next: LEFT" only change every so often, so most frames
+    are a dictionary hit rather than a font render.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font_name, size, text, color):
+        key = (font_name, size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = get_font(font_name, size).render(text, True, pygame.Color(color))
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+text_cache = TextCache()
+
+
+def render_text(font_name, size, text, color):
+    return text_cache.render(font_name, size, text, color)
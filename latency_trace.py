@@ -0,0 +1,76 @@
+"""Monotonic timestamps for each stage an input passes through, from camera to Arduino.
+
+    python pose_controller_v2.py --output ipc --trace controller.trace
+    python maze_game.py --input ipc --trace game.trace
+    python latency_trace.py controller.trace game.trace
+
+Each record is 13 bytes: event id, stage and ``time.monotonic_ns()``. The
+event id is the camera frame number, carried to the game over IPC, and the
+monotonic clock is shared by processes on one machine. So traces written by
+the controller and the game can be joined by event id.
+"""
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# In the order an input passes through them
+STAGES = ('capture', 'inference', 'trigger', 'delivered', 'consumed', 'serial')
+RECORD = struct.Struct("<IBq")  # event id, index into STAGES, monotonic ns
+RECORD_DTYPE = np.dtype([('event_id', '<u4'), ('stage', 'u1'), ('t_ns', '<i8')])
+
+
+class Tracer:
+    def __init__(self, path):
+        self.path = path
+        # Truncated: event ids restart at 0 each run, so old stamps would be joined with new ones
+        self.file = open(path, "wb", buffering=64 * 1024)
+        self.lock = threading.Lock()
+
+    def stamp(self, event_id, stage, t_ns=None):
+        if t_ns is None:
+            t_ns = time.monotonic_ns()
+        record = RECORD.pack(event_id & 0xFFFFFFFF, STAGES.index(stage), t_ns)
+        with self.lock:
+            if not self.file.closed:  # The Arduino writer thread can outlive the game loop
+                self.file.write(record)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def load(paths):
+    return np.concatenate([np.fromfile(path, dtype=RECORD_DTYPE) for path in paths])
+
+
+def summarise(records):
+    """Latency percentiles between consecutive stages, and from capture to each later stage."""
+    events = defaultdict(dict)
+    for event_id, stage, t_ns in records.tolist():
+        # An event can be delivered more than once; its first stamp is the one that counts
+        events[event_id].setdefault(STAGES[stage], t_ns)
+
+    spans = defaultdict(list)
+    for stamps in events.values():
+        seen = [stage for stage in STAGES if stage in stamps]
+        for earlier, later in zip(seen, seen[1:]):
+            spans[f"{earlier} -> {later}"].append(stamps[later] - stamps[earlier])
+        if 'capture' in stamps:
+            for later in seen[2:]:
+                spans[f"capture -> {later} (total)"].append(stamps[later] - stamps['capture'])
+
+    print(f"{'span':32} {'n':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for span, deltas in spans.items():
+        ms = np.asarray(deltas) / 1e6
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        print(f"{span:32} {len(ms):7} {p50:8.1f} {p90:8.1f} {p99:8.1f} {ms.max():8.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    summarise(load(sys.argv[1:]))
@@ -0,0 +1,159 @@
+import random
+from array import array
+from collections import deque
+
+import numpy as np
+
+# One bit per wall in each cell's uint8
+TOP, RIGHT, BOTTOM, LEFT = 1, 2, 4, 8
+ALL_WALLS = TOP | RIGHT | BOTTOM | LEFT
+WALL_BITS = {'top': TOP, 'right': RIGHT, 'bottom': BOTTOM, 'left': LEFT}
+
+# End points of each wall, in tiles relative to the cell's top-left corner
+WALL_CORNERS = {
+    'top': ((0, 0), (1, 0)),
+    'right': ((1, 0), (1, 1)),
+    'bottom': ((1, 1), (0, 1)),
+    'left': ((0, 1), (0, 0)),
+}
+
+
+class CellWalls:
+    """Dict-like ``{'top': bool, ...}`` view onto one cell's wall bits."""
+
+    __slots__ = ('grid', 'x', 'y')
+
+    def __init__(self, grid, x, y):
+        self.grid, self.x, self.y = grid, x, y
+
+    def __getitem__(self, side):
+        return bool(self.grid.walls[self.y, self.x] & WALL_BITS[side])
+
+    def __setitem__(self, side, present):
+        if present:
+            self.grid.walls[self.y, self.x] |= WALL_BITS[side]
+        else:
+            self.grid.walls[self.y, self.x] &= ALL_WALLS ^ WALL_BITS[side]
+
+    def __iter__(self):
+        return iter(WALL_BITS)
+
+    def items(self):
+        return [(side, self[side]) for side in WALL_BITS]
+
+
+class DistanceField:
+    """Distance to one goal cell for every cell, plus the neighbouring cell one step closer.
+
+    Both arrays are flat and indexed by ``x + y * cols``; unreachable cells have a
+    distance of -1 and the goal itself has a next hop of -1.
+    """
+
+    def __init__(self, cols, distance, next_hop):
+        self.cols = cols
+        self.distance = distance
+        self.next_hop = next_hop
+
+    def path_from(self, index):
+        """Cells ``(x, y)`` from ``index`` to the goal, or ``[]`` if the goal is unreachable."""
+        if self.distance[index] == -1:
+            return []
+        cols = self.cols
+        next_hop = self.next_hop
+        index = int(index)
+        path = [(index % cols, index // cols)]
+        while next_hop[index] != -1:
+            index = int(next_hop[index])
+            path.append((index % cols, index // cols))
+        return path
+
+
+class MazeGrid:
+    """Maze stored as a ``(rows, cols)`` uint8 array holding one bit per wall.
+
+    Neighbouring cells keep their shared wall in sync, so the right wall of
+    ``(x, y)`` is always the same as the left wall of ``(x + 1, y)``.
+    """
+
+    def __init__(self, cols, rows, walls=None):
+        self.cols, self.rows = cols, rows
+        if walls is None:
+            walls = np.full((rows, cols), ALL_WALLS, dtype=np.uint8)
+        self.walls = walls
+
+    def __len__(self):
+        return self.cols * self.rows
+
+    def wall_segments(self):
+        """Yield ``(x, y, side)`` once per wall.
+
+        Every cell reports its top and left walls; right and bottom walls are only
+        reported along the outer edge, where there is no neighbour to share them.
+        """
+        walls = self.walls
+        for side, bit in (('top', TOP), ('left', LEFT)):
+            ys, xs = np.nonzero(walls & bit)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                yield x, y, side
+        for y in np.nonzero(walls[:, -1] & RIGHT)[0].tolist():
+            yield self.cols - 1, y, 'right'
+        for x in np.nonzero(walls[-1] & BOTTOM)[0].tolist():
+            yield x, self.rows - 1, 'bottom'
+
+    def distance_field(self, end):
+        """BFS outwards from ``end`` over the open passages, once for the whole maze."""
+        cols = self.cols
+        walls = self.walls.tobytes()
+        distance = array('i', [-1]) * len(walls)
+        next_hop = array('i', [-1]) * len(walls)
+        end_index = end[0] + end[1] * cols
+        distance[end_index] = 0
+        queue = deque([end_index])
+
+        while queue:
+            index = queue.popleft()
+            cell_walls = walls[index]
+            step = distance[index] + 1
+            for wall, neighbor in ((RIGHT, index + 1), (LEFT, index - 1),
+                                   (BOTTOM, index + cols), (TOP, index - cols)):
+                if not cell_walls & wall and distance[neighbor] == -1:
+                    distance[neighbor] = step
+                    next_hop[neighbor] = index
+                    queue.append(neighbor)
+        return DistanceField(cols,
+                             np.frombuffer(distance, dtype=np.intc),
+                             np.frombuffer(next_hop, dtype=np.intc))
+
+    def shortest_path(self, start, end):
+        return self.distance_field(end).path_from(start[0] + start[1] * self.cols)
+
+
+def generate_backtracker(cols, rows, rng=random):
+    """Randomised depth-first backtracker, carving passages straight into the bitmask."""
+    size = cols * rows
+    walls = bytearray([ALL_WALLS]) * size
+    visited = bytearray(size)
+    stack = []
+    current = 0
+    visited[current] = 1
+    visited_count = 1
+
+    while visited_count < size:
+        y, x = divmod(current, cols)
+        neighbors = []
+        if y > 0 and not visited[current - cols]: neighbors.append((current - cols, TOP, BOTTOM))
+        if x < cols - 1 and not visited[current + 1]: neighbors.append((current + 1, RIGHT, LEFT))
+        if y < rows - 1 and not visited[current + cols]: neighbors.append((current + cols, BOTTOM, TOP))
+        if x > 0 and not visited[current - 1]: neighbors.append((current - 1, LEFT, RIGHT))
+
+        if neighbors:
+            next_cell, wall, opposite = rng.choice(neighbors)
+            walls[current] &= ALL_WALLS ^ wall
+            walls[next_cell] &= ALL_WALLS ^ opposite
+            visited[next_cell] = 1
+            visited_count += 1
+            stack.append(current)
+            current = next_cell
+        elif stack:
+            current = stack.pop()
+    return MazeGrid(cols, rows, np.frombuffer(walls, dtype=np.uint8).reshape(rows, cols))
@@ -1,44 +1,95 @@
+import random
+import threading
+import time
 import pygame
-import matplotlib.pyplot as plt  # For histogram plotting
-from random import choice
-from collections import deque
-from pyduino_controller import PyduinoController
+from maze_array import CellWalls
+from maze_generators import GENERATORS, generate
+from pyduino_controller import AsyncCommandWriter, PyduinoController
+from wall_index import WallIndex
+from maze_renderer import MazeRenderer, PathOverlay
+from frame_profiler import FrameProfiler
+from hud import render_text
+from results_view import HistogramWorker, draw_histogram
+from completion_store import CompletionStore
+from direction_ipc import DirectionReceiver
+from latency_trace import Tracer
+from endless_maze import EndlessGame
+from maze_library import BANDS, MazeLibrary
+from pathfinding import bfs
+from audio_assets import SoundBank, configure_mixer
 from pygame import mixer
 
-# Initialize pygame and mixer
-pygame.init()
-mixer.init()
-
-# Attempt to initialize the Arduino controller.
-# If it fails, ARDUINO will be set to None and the game continues without Arduino integration.
-try:
-    ARDUINO = PyduinoController()
-except Exception as e:
-    print("Arduino not found or failed to initialize:", e)
-    ARDUINO = None
+# Set by connect_arduino() once the board is up; until then (or if it fails)
+# the game simply runs without Arduino integration.
+ARDUINO = None
 
 # Game constants
 RES = WIDTH, HEIGHT = 900, 700
 TILE = 100
 cols, rows = WIDTH // TILE, HEIGHT // TILE
 end_point = (cols - 1, rows - 1)  # Bottom-right corner
-FPS = 60
+FPS = 60  # Render rate cap; 0 leaves it uncapped
+SIM_RATE = 60  # Simulation steps per second, whatever the render rate
+SIM_STEP_MS = 1000 / SIM_RATE
+GENERATOR = 'backtracker'  # Any name in maze_generators.GENERATORS
+DIFFICULTY = None  # 'easy', 'medium' or 'hard' picks from that band of the maze library
+MAZE_SEED = None  # Replays one maze instead of a random one
+VERBOSE = False  # Print each maze's seed
+# Parts of a frame timed by the profiler (F3 shows them)
+PROFILE_PHASES = ('events', 'simulate', 'draw', 'route', 'progress', 'arduino', 'hud', 'present', 'sleep')
+STEP = 5  # Player speed in pixels per simulation step
+MOVES = {'LEFT': (-STEP, 0), 'RIGHT': (STEP, 0), 'UP': (0, -STEP), 'DOWN': (0, STEP)}
+
+# Built with `python maze_library.py build`; without it every maze is generated on the spot
+LIBRARY = MazeLibrary()
+
+# Picks up the old completion_times.tex the first time it is used
+COMPLETION_TIMES = CompletionStore()
 
 # SOUND EFFECTS
-OUCH_SFX = mixer.Sound('sfx/ouch.mp3')
-YAY_SFX = mixer.Sound('sfx/yay.mp3')
-# New threshold sounds
-THRESHOLD_25_SFX = mixer.Sound('sfx/25.mp3')
-THRESHOLD_50_SFX = mixer.Sound('sfx/50.mp3')
-THRESHOLD_75_SFX = mixer.Sound('sfx/75.mp3')
+SOUNDS = SoundBank({
+    'ouch': 'sfx/ouch.mp3',
+    'yay': 'sfx/yay.mp3',
+    # New threshold sounds
+    'threshold_25': 'sfx/25.mp3',
+    'threshold_50': 'sfx/50.mp3',
+    'threshold_75': 'sfx/75.mp3',
+})
+
+
+def connect_arduino(tracer=None):
+    """Connect to the Arduino; PyduinoController waits 2 s for the board, so run this off the main thread."""
+    global ARDUINO
+    try:
+        # Serial writes happen on a background thread so a slow USB link never stalls a frame.
+        ARDUINO = AsyncCommandWriter(PyduinoController(), tracer=tracer)
+    except Exception as e:
+        print("Arduino not found or failed to initialize:", e)
+        ARDUINO = None
+
+
+def init(connect=True, tracer=None, audio=True):
+    """Start pygame, and leave sound loading and the Arduino connection to background threads.
+
+    Without ``audio`` no sounds are decoded and SOUNDS.play() does nothing.
+    """
+    if audio:
+        configure_mixer()
+    pygame.init()
+    if audio:
+        mixer.init()
+        SOUNDS.load_async()
+    if connect:
+        threading.Thread(target=connect_arduino, args=(tracer,), daemon=True).start()
 
 
 class Cell:
-    def __init__(self, x, y):
+    """Thin view of one cell of a MazeGrid, for code that walks the maze cell by cell."""
+    thickness = 8  # Thicker walls
+
+    def __init__(self, x, y, grid):
         self.x, self.y = x, y
-        self.walls = {'top': True, 'right': True, 'bottom': True, 'left': True}
-        self.visited = False
-        self.thickness = 8  # Thicker walls
+        self.walls = CellWalls(grid, x, y)
 
     def draw(self, sc):
         x, y = self.x * TILE, self.y * TILE
@@ -64,25 +115,6 @@ class Cell:
             rects.append(pygame.Rect((x, y), (self.thickness, TILE)))
         return rects
 
-    def check_cell(self, x, y, grid_cells):
-        find_index = lambda x, y: x + y * cols
-        if x < 0 or x >= cols or y < 0 or y >= rows:
-            return False
-        return grid_cells[find_index(x, y)]
-
-    def check_neighbors(self, grid_cells):
-        neighbors = []
-        top = self.check_cell(self.x, self.y - 1, grid_cells)
-        right = self.check_cell(self.x + 1, self.y, grid_cells)
-        bottom = self.check_cell(self.x, self.y + 1, grid_cells)
-        left = self.check_cell(self.x - 1, self.y, grid_cells)
-
-        if top and not top.visited: neighbors.append(top)
-        if right and not right.visited: neighbors.append(right)
-        if bottom and not bottom.visited: neighbors.append(bottom)
-        if left and not left.visited: neighbors.append(left)
-        return choice(neighbors) if neighbors else False
-
 
 def remove_walls(current, next):
     dx = current.x - next.x
@@ -101,52 +133,26 @@ def remove_walls(current, next):
         next.walls['top'] = False
 
 
-def generate_maze():
-    grid_cells = [Cell(col, row) for row in range(rows) for col in range(cols)]
-    current_cell = grid_cells[0]
-    stack = []
-    visited_count = 1
+def generate_maze(seed=None):
+    return generate(GENERATOR, cols, rows, seed)
 
-    while visited_count < len(grid_cells):
-        current_cell.visited = True
-        next_cell = current_cell.check_neighbors(grid_cells)
 
-        if next_cell:
-            next_cell.visited = True
-            visited_count += 1
-            stack.append(current_cell)
-            remove_walls(current_cell, next_cell)
-            current_cell = next_cell
-        elif stack:
-            current_cell = stack.pop()
-    return grid_cells
+def load_maze(band=None, seed=None):
+    """``(seed, maze, distance_field)``, taken from the maze library when it has mazes of this size."""
+    if LIBRARY.matches(cols, rows, end_point, GENERATOR):
+        if seed is None:
+            return LIBRARY.pick(band)
+        number = LIBRARY.find(seed)
+        if number is not None:
+            return LIBRARY.entry(number)
+    if seed is None:
+        seed = random.randrange(2**32)
+    maze = generate_maze(seed)
+    return seed, maze, maze.distance_field(end_point)
 
 
 def find_shortest_path(maze_grid, start=(0, 0), end=end_point):
-    queue = deque([[start]])
-    visited = set(start)
-
-    while queue:
-        path = queue.popleft()
-        x, y = path[-1]
-
-        if (x, y) == end:
-            return path
-
-        current_index = x + y * cols
-        current_cell = maze_grid[current_index]
-
-        neighbors = []
-        if not current_cell.walls['right']: neighbors.append((x + 1, y))
-        if not current_cell.walls['left']: neighbors.append((x - 1, y))
-        if not current_cell.walls['bottom']: neighbors.append((x, y + 1))
-        if not current_cell.walls['top']: neighbors.append((x, y - 1))
-
-        for neighbor in neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append(path + [neighbor])
-    return []
+    return bfs(maze_grid, start, end)
 
 
 def get_directions(path):
@@ -165,270 +171,496 @@ def get_directions(path):
     return directions
 
 
+class FixedTimestep:
+    """Turns real frame times into a whole number of fixed-length simulation steps.
+
+    Time left over carries into the next frame, and ``alpha`` is how far the
+    render falls between the last two steps. After a long stall at most
+    ``max_steps`` are run, so the game pauses rather than spiralling.
+    """
+
+    def __init__(self, rate=SIM_RATE, max_steps=10):
+        self.step_ns = 10**9 // rate
+        self.max_steps = max_steps
+        self.accumulator = 0
+        self.last_ns = None
+
+    def advance(self, elapsed_ns=None):
+        """Add a frame's time, by default the real time since the last call, and return the steps to run."""
+        now = time.perf_counter_ns()
+        if elapsed_ns is None:
+            elapsed_ns = 0 if self.last_ns is None else now - self.last_ns
+        self.last_ns = now
+        self.accumulator = min(self.accumulator + elapsed_ns, self.max_steps * self.step_ns)
+        steps = self.accumulator // self.step_ns
+        self.accumulator -= steps * self.step_ns
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step_ns
+
+
 class Stopwatch:
+    """Game time in milliseconds, advanced by the simulation so slow frames don't change anyone's time."""
+
     def __init__(self):
-        self.start_time = pygame.time.get_ticks()
         self.elapsed = 0
         self.running = True
 
-    def get_time(self):
+    def tick(self, ms):
         if self.running:
-            self.elapsed = pygame.time.get_ticks() - self.start_time
+            self.elapsed += ms
+
+    def get_time(self):
         return self.elapsed
 
     def format_time(self):
         ms = self.get_time()
-        s = ms // 1000
+        s = int(ms) // 1000
         m, s = divmod(s, 60)
         return f"{m:02}:{s:02}"
 
 
-def get_current_path_completion_percentage(current_path) -> int:
-    return 100 - int(round(len(current_path) / len(total_path) * 100))
+def get_current_path_completion_percentage() -> int:
+    remaining = int(distance_field.distance[current_cell_index()]) + 1
+    return 100 - int(round(remaining / len(total_path) * 100))
 
 
-# --- Functions to save and display completion times ---
+# --- Functions to save and load completion times ---
 
 def save_completion_time(time_seconds):
-    """Append the completion time (in seconds) to a tex file."""
-    with open("completion_times.tex", "a") as f:
-        f.write(f"{time_seconds}\n")
+    """Append the completion time (in seconds) to the completion time store."""
+    COMPLETION_TIMES.append(time_seconds)
 
 
-def load_completion_times():
-    """Load all completion times from the tex file."""
-    times = []
-    try:
-        with open("completion_times.tex", "r") as f:
-            for line in f:
-                try:
-                    times.append(float(line.strip()))
-                except ValueError:
-                    continue
-    except FileNotFoundError:
-        pass
-    return times
-
-
-def show_histogram(current_time):
-    """Display a histogram of all completion times with a vertical line for the current time."""
-    times = load_completion_times()
-    plt.hist(times, bins=50, color='skyblue')
-    plt.axvline(current_time, color='red', linestyle='dashed', linewidth=2,
-                label=f"Current Time: {current_time:.2f}s")
-    plt.xlabel("Completion Time (seconds)")
-    plt.ylabel("Frequency")
-    plt.title("Completion Times Histogram")
-    plt.legend()
-    plt.show()
+def load_completion_times(count=None):
+    """Load the first ``count`` completion times (all by default) as an array mapped from the store."""
+    return COMPLETION_TIMES.load()[:count]
 
 
 # --- Game-related functions ---
 
 def initialize_game():
-    global maze, path, directions, player_rect, current_dir, game_active, stopwatch, total_path, time_saved, histogram_shown
-    global played_25, played_50, played_75
-    maze = generate_maze()
-    path = find_shortest_path(maze)
+    global maze, path, directions, player_rect, current_dir, game_active, stopwatch, total_path, time_saved
+    global played_25, played_50, played_75, distance_field, wall_index, previous_topleft
+    seed, maze, distance_field = load_maze(DIFFICULTY, MAZE_SEED)
+    if VERBOSE:
+        print(f"Maze seed {seed}")
+    wall_index = WallIndex(maze, TILE, Cell.thickness)
+    path = distance_field.path_from(0)
     total_path = path.copy()
     directions = get_directions(path)
     player_rect = pygame.Rect(TILE // 2 - 15, TILE // 2 - 15, 30, 30)  # Smaller player
+    previous_topleft = player_rect.topleft  # Where the last simulation step started, for interpolation
     current_dir = (0, 0)
     game_active = True
     stopwatch = Stopwatch()
     time_saved = False       # Ensure we save time only once per completion
-    histogram_shown = False  # Show histogram only once after game over
     # Initialize threshold flags
     played_25 = False
     played_50 = False
     played_75 = False
 
 
+def current_cell_index():
+    return player_rect.centerx // TILE + (player_rect.centery // TILE) * cols
+
+
 def find_current_path():
-    px, py = player_rect.centerx // TILE, player_rect.centery // TILE
-    return find_shortest_path(maze, (px, py), end_point)
+    """Remaining route from the player's cell to the goal, read off the next-hop table."""
+    return distance_field.path_from(current_cell_index())
 
 
 def get_next_direction():
-    current_path = find_current_path()
-    if len(current_path) < 2:
+    index = current_cell_index()
+    hop = int(distance_field.next_hop[index])
+    if hop == -1:
         return ""
-    dx = current_path[1][0] - current_path[0][0]
-    dy = current_path[1][1] - current_path[0][1]
     return {
-        (1, 0): 'RIGHT',
-        (-1, 0): 'LEFT',
-        (0, 1): 'DOWN',
-        (0, -1): 'UP'
-    }.get((dx, dy), '')
+        1: 'RIGHT',
+        -1: 'LEFT',
+        cols: 'DOWN',
+        -cols: 'UP'
+    }.get(hop - index, '')
 
 
-def send_direction_to_arduino(direction: str):
+def send_direction_to_arduino(direction: str, event_id=None):
     # Only send commands if the ARDUINO is initialized.
+    # event_id is the latest traced input, so the trace shows when the LED next changes.
     if ARDUINO is None:
         return
     if direction == 'RIGHT':
-        ARDUINO.send_command('R')
+        ARDUINO.send_command('R', event_id)
     elif direction == 'LEFT':
-        ARDUINO.send_command('L')
+        ARDUINO.send_command('L', event_id)
     elif direction == 'UP':
-        ARDUINO.send_command('U')
+        ARDUINO.send_command('U', event_id)
     elif direction == 'DOWN':
-        ARDUINO.send_command('D')
+        ARDUINO.send_command('D', event_id)
 
 
 def draw_interface(screen, stopwatch, next_dir, percent_complete):
     # Draw stopwatch
-    time_text = pygame.font.SysFont('Arial', 40).render(
-        f"Time: {stopwatch.format_time()}", True, pygame.Color('white'))
-    screen.blit(time_text, (20, 20))
+    time_text = render_text('Arial', 40, f"Time: {stopwatch.format_time()}", 'white')
 
     # Draw direction suggestion
-    dir_text = pygame.font.SysFont('Arial', 60).render(
-        f"Next: {next_dir}", True, pygame.Color('limegreen'))
-    screen.blit(dir_text, (WIDTH // 2 - 100, 20))
+    dir_text = render_text('Arial', 60, f"Next: {next_dir}", 'limegreen')
+
+    percent_text = render_text('Arial', 40, f"Completion: {percent_complete}%", 'white')
 
-    percent_text = pygame.font.SysFont('Arial', 40).render(
-        f"Completion: {percent_complete}%", True, pygame.Color('white'))
-    screen.blit(percent_text, (WIDTH // 2 - 100, 100))
+    # Return the drawn areas so the renderer can update just those
+    return [
+        screen.blit(time_text, (20, 20)),
+        screen.blit(dir_text, (WIDTH // 2 - 100, 20)),
+        screen.blit(percent_text, (WIDTH // 2 - 100, 100)),
+    ]
 
 
-def draw_end_screen(screen, stopwatch):
+def draw_end_screen(screen, stopwatch, results=None):
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     overlay.fill((0, 0, 0, 200))
     screen.blit(overlay, (0, 0))
 
-    text = pygame.font.SysFont('Arial', 80).render("MAZE SOLVED!", True, pygame.Color('yellow'))
-    time_text = pygame.font.SysFont('Arial', 60).render(
-        f"Time: {stopwatch.format_time()}", True, pygame.Color('yellow'))
-    restart_text = pygame.font.SysFont('Arial', 40).render(
-        "Press R to restart", True, pygame.Color('white'))
+    if results is not None:
+        draw_histogram(screen, (WIDTH // 2 - 300, 30, 600, HEIGHT // 2 - 110),
+                       results.snapshot(), stopwatch.get_time() / 1000.0)
+
+    text = render_text('Arial', 80, "MAZE SOLVED!", 'yellow')
+    time_text = render_text('Arial', 60, f"Time: {stopwatch.format_time()}", 'yellow')
+    restart_text = render_text('Arial', 40, "Press R to restart", 'white')
 
     screen.blit(text, (WIDTH // 2 - 250, HEIGHT // 2 - 60))
     screen.blit(time_text, (WIDTH // 2 - 150, HEIGHT // 2 + 40))
     screen.blit(restart_text, (WIDTH // 2 - 120, HEIGHT // 2 + 120))
 
 
-def handle_movement():
+class KeyboardInput:
+    """Arrow keys / WASD, which is also what the pose controller presses."""
+
+    def poll(self):
+        keys = pygame.key.get_pressed()
+        direction = None
+
+        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+            print("LEFT")
+            direction = 'LEFT'
+        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+            print("RIGHT")
+            direction = 'RIGHT'
+        if keys[pygame.K_w] or keys[pygame.K_UP]:
+            print("UP")
+            direction = 'UP'
+        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+            print("DOWN")
+            direction = 'DOWN'
+        return direction
+
+
+class IpcInput:
+    """Directions sent straight from the pose controller, falling back to the keyboard.
+
+    Saves the trip through the OS input stack, and needs neither root nor a
+    focused window on the controller side.
+    """
+
+    def __init__(self, receiver=None, fallback=None, tracer=None):
+        self.receiver = receiver or DirectionReceiver()
+        self.fallback = fallback or KeyboardInput()
+        self.tracer = tracer
+        self.last_event = None
+
+    def poll(self):
+        events = self.receiver.poll()
+        if events:
+            self.last_event = events[-1]
+            if self.tracer is not None:
+                for event in events:
+                    self.tracer.stamp(event.event_id, 'delivered', event.received_ns)
+                # Only the newest event steers the player; older ones in the batch are superseded
+                self.tracer.stamp(self.last_event.event_id, 'consumed')
+            return self.last_event.direction
+        return self.fallback.poll()
+
+
+class BotInput:
+    """Follows the solved route, for headless runs with no player."""
+
+    def poll(self):
+        direction = get_next_direction()
+        index = current_cell_index()
+        center_x = (index % cols) * TILE + TILE // 2
+        center_y = (index // cols) * TILE + TILE // 2
+        # Line up with the middle of the cell before turning, or the player clips the corner
+        if direction in ('LEFT', 'RIGHT') and player_rect.centery != center_y:
+            return 'UP' if player_rect.centery > center_y else 'DOWN'
+        if direction in ('UP', 'DOWN') and player_rect.centerx != center_x:
+            return 'LEFT' if player_rect.centerx > center_x else 'RIGHT'
+        return direction or None
+
+
+def handle_movement(input_source):
     global current_dir
-    keys = pygame.key.get_pressed()
-
-    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-        print("LEFT")
-        current_dir = (-5, 0)
-    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-        print("RIGHT")
-        current_dir = (5, 0)
-    if keys[pygame.K_w] or keys[pygame.K_UP]:
-        print("UP")
-        current_dir = (0, -5)
-    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-        print("DOWN")
-        current_dir = (0, 5)
+    direction = input_source.poll()
+    if direction:
+        current_dir = MOVES[direction]
 
 
 def move_player():
+    global previous_topleft
+    previous_topleft = player_rect.topleft
     if game_active and current_dir != (0, 0):
         new_pos = player_rect.move(current_dir)
-        if new_pos.collidelist(walls_collide_list) == -1:
+        if not wall_index.collides(new_pos):
             player_rect.move_ip(current_dir)
         # Collision handling (sound effects, etc.) can be added here
 
 
-def main():
-    global game_active, walls_collide_list, time_saved, histogram_shown
+def simulate_step(input_source):
+    """Advance the game by one fixed step; returns True if the player reached the end."""
+    handle_movement(input_source)
+    move_player()
+    stopwatch.tick(SIM_STEP_MS)
+    return player_rect.colliderect(pygame.Rect(end_point[0] * TILE, end_point[1] * TILE, TILE, TILE))
+
+
+def interpolated_player_rect(alpha):
+    """The player ``alpha`` of the way from the start to the end of the last simulation step."""
+    x0, y0 = previous_topleft
+    rect = player_rect.copy()
+    rect.topleft = (round(x0 + (rect.x - x0) * alpha), round(y0 + (rect.y - y0) * alpha))
+    return rect
+
+
+def main(input_source=None, fps=FPS, max_frames=None, max_games=None, headless=False, tracer=None,
+         profiler=None):
+    """Run the game loop and return ``(frame_times_ns, games_completed)``.
+
+    ``headless`` runs skip the Arduino, saving completion times and the results
+    view, and start the next maze as soon as one is solved. The loop stops after
+    ``max_frames`` frames or ``max_games`` solved mazes, if given; ``fps=0``
+    leaves it uncapped. The game itself always runs at SIM_RATE steps per
+    second, except headless, where every frame is exactly one step.
+    ``profiler`` is a FrameProfiler over PROFILE_PHASES, e.g. one that exports.
+    """
+    global game_active, time_saved
     global played_25, played_50, played_75
 
+    init(connect=not headless, tracer=tracer, audio=not headless)
+    input_source = input_source or KeyboardInput()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     clock = pygame.time.Clock()
+    renderer = MazeRenderer(screen)
+    timestep = FixedTimestep()
+    route = PathOverlay(TILE)
+    profiler = profiler or FrameProfiler(PROFILE_PHASES)
+    results = None
+    if not headless:
+        # Past times load and bin in the background; the end screen draws whatever is ready.
+        # Only the times stored by now, as this session's arrive through add_time()
+        past_count = len(COMPLETION_TIMES)
+        results = HistogramWorker(lambda: load_completion_times(past_count))
+        results.start()
     initialize_game()
+    renderer.build(maze, end_point, TILE, Cell.thickness)
     yay_played = False
+    frame_times = []
+    games_completed = 0
 
-    while True:
-        screen.fill(pygame.Color('black'))
+    while ((max_frames is None or len(frame_times) < max_frames)
+           and (max_games is None or games_completed < max_games)):
+        frame_start = time.perf_counter_ns()
+        profiler.begin()
+        # The end screen overlays the whole maze, so repaint everything while it shows
+        renderer.begin_frame(full_redraw=not game_active)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                profiler.close()
                 pygame.quit()
-                return
+                return frame_times, games_completed
             if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
                 if not game_active and event.key == pygame.K_r:
                     initialize_game()
+                    renderer.build(maze, end_point, TILE, Cell.thickness)
                     yay_played = False
+        profiler.lap('events')
 
+        show_end_screen = not game_active and not headless
+        steps = timestep.advance(timestep.step_ns if headless else None)
         if game_active:
-            handle_movement()
-            move_player()
-
-            # Update collisions and path
-            walls_collide_list = sum([cell.get_rects() for cell in maze], [])
-            # Check for completion (player reaches end point)
-            if player_rect.colliderect(pygame.Rect(end_point[0] * TILE, end_point[1] * TILE, TILE, TILE)):
-                game_active = False
-                stopwatch.running = False
+            for _ in range(steps):
+                if simulate_step(input_source):
+                    game_active = False
+                    stopwatch.running = False
+                    games_completed += 1
+                    break
+        elif headless:
+            initialize_game()
+            renderer.build(maze, end_point, TILE, Cell.thickness)
         else:
             # When game ends, save the completion time only once.
             if not time_saved:
                 comp_time = stopwatch.get_time() / 1000.0  # Convert milliseconds to seconds
                 save_completion_time(comp_time)
+                results.add_time(comp_time)
                 time_saved = True
 
-            draw_end_screen(screen, stopwatch)
             if not yay_played:
-                YAY_SFX.play()
+                SOUNDS.play('yay')
                 # Only send the finish command if ARDUINO exists.
                 if ARDUINO:
                     ARDUINO.send_command('F')
                 yay_played = True
+        profiler.lap('simulate')
 
-            # Show the histogram only once after game completion.
-            if not histogram_shown:
-                current_time_sec = stopwatch.get_time() / 1000.0
-                show_histogram(current_time_sec)
-                histogram_shown = True
-
-        # Draw maze
-        for cell in maze:
-            cell.draw(screen)
-
-        # Draw player and endpoint
-        pygame.draw.rect(screen, pygame.Color('red'),
-                         (end_point[0] * TILE + 10, end_point[1] * TILE + 10, TILE - 20, TILE - 20))
-        pygame.draw.rect(screen, pygame.Color('cyan'), player_rect)
-
-        # Draw current path as a dotted line
-        current_path = find_current_path()
-        if current_path:
-            path_points = [(x * TILE + TILE // 2, y * TILE + TILE // 2) for (x, y) in current_path]
-            for i in range(len(path_points) - 1):
-                start = path_points[i]
-                end = path_points[i + 1]
-                num_dots = int(((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2) ** 0.5 // 10)
-                for j in range(num_dots):
-                    t = j / num_dots
-                    dot_x = int(start[0] + t * (end[0] - start[0]))
-                    dot_y = int(start[1] + t * (end[1] - start[1]))
-                    pygame.draw.circle(screen, pygame.Color('limegreen'), (dot_x, dot_y), 2)
-
-        percent_complete = get_current_path_completion_percentage(current_path)
+        if show_end_screen:
+            draw_end_screen(screen, stopwatch, results)
+
+        # Draw player (the maze and endpoint are part of the renderer's background)
+        drawn_player = interpolated_player_rect(timestep.alpha) if game_active else player_rect
+        renderer.mark(pygame.draw.rect(screen, pygame.Color('cyan'), drawn_player))
+        profiler.lap('draw')
+
+        # Draw current path as a dotted line, redrawn only when the player changes tile
+        route_rect = route.draw(screen, (current_cell_index(), distance_field), find_current_path)
+        if route_rect:
+            renderer.mark(route_rect)
+        profiler.lap('route')
+
+        percent_complete = get_current_path_completion_percentage()
         # Check and play threshold sounds (only once per threshold)
         if not played_25 and percent_complete >= 25:
-            THRESHOLD_25_SFX.play()
+            SOUNDS.play('threshold_25')
             played_25 = True
         if not played_50 and percent_complete >= 50:
-            THRESHOLD_50_SFX.play()
+            SOUNDS.play('threshold_50')
             played_50 = True
         if not played_75 and percent_complete >= 75:
-            THRESHOLD_75_SFX.play()
+            SOUNDS.play('threshold_75')
             played_75 = True
 
         next_dir = get_next_direction() if game_active else ""
-        send_direction_to_arduino(next_dir)
-        draw_interface(screen, stopwatch, next_dir, percent_complete)
+        profiler.lap('progress')
+        last_event = getattr(input_source, 'last_event', None)
+        send_direction_to_arduino(next_dir, last_event.event_id if last_event else None)
+        profiler.lap('arduino')
+        renderer.mark(*draw_interface(screen, stopwatch, next_dir, percent_complete))
+        profiler_rect = profiler.draw(screen, (WIDTH - 10, 160))
+        if profiler_rect:
+            renderer.mark(profiler_rect)
+        profiler.lap('hud')
+
+        renderer.present()
+        profiler.lap('present')
+        frame_times.append(time.perf_counter_ns() - frame_start)
+        clock.tick(fps)
+        profiler.lap('sleep')
+        profiler.end()
+
+    profiler.close()
+    return frame_times, games_completed
+
+
+def main_endless(input_source=None, fps=FPS, max_frames=None, max_goals=None, headless=False, tracer=None,
+                 profiler=None, game=None, seed=None):
+    """Endless mode: the maze keeps growing downwards and each goal is further away than the last.
+
+    Returns ``(frame_times_ns, goals_reached)``; the other arguments are as for
+    ``main()``. ``game`` is an EndlessGame to play, e.g. one an EndlessBot follows.
+    The route is drawn with the maze, so its time counts towards 'draw'.
+    """
+    init(connect=not headless, tracer=tracer, audio=not headless)
+    input_source = input_source or KeyboardInput()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    clock = pygame.time.Clock()
+    game = game or EndlessGame(cols, TILE, Cell.thickness, seed)
+    timestep = FixedTimestep()
+    profiler = profiler or FrameProfiler(PROFILE_PHASES)
+    move = (0, 0)
+    frame_times = []
+
+    while ((max_frames is None or len(frame_times) < max_frames)
+           and (max_goals is None or game.goals_reached < max_goals)):
+        frame_start = time.perf_counter_ns()
+        profiler.begin()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                profiler.close()
+                pygame.quit()
+                return frame_times, game.goals_reached
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+        profiler.lap('events')
+
+        for _ in range(timestep.advance(timestep.step_ns if headless else None)):
+            direction = input_source.poll()
+            if direction:
+                move = MOVES[direction]
+            if game.move(move):
+                SOUNDS.play('yay')
+        profiler.lap('simulate')
+
+        game.draw(screen, timestep.alpha)
+        profiler.lap('draw')
+        next_dir = game.next_direction()
+        profiler.lap('progress')
+        last_event = getattr(input_source, 'last_event', None)
+        send_direction_to_arduino(next_dir, last_event.event_id if last_event else None)
+        profiler.lap('arduino')
+        screen.blit(render_text('Arial', 40, f"Goals: {game.goals_reached}", 'white'), (20, 20))
+        screen.blit(render_text('Arial', 60, f"Next: {next_dir}", 'limegreen'), (WIDTH // 2 - 100, 20))
+        screen.blit(render_text('Arial', 40, f"Depth: {game.depth()}", 'white'), (WIDTH // 2 - 100, 100))
+        profiler.draw(screen, (WIDTH - 10, 160))
+        profiler.lap('hud')
 
         pygame.display.flip()
-        clock.tick(FPS)
+        profiler.lap('present')
+        frame_times.append(time.perf_counter_ns() - frame_start)
+        clock.tick(fps)
+        profiler.lap('sleep')
+        profiler.end()
+
+    profiler.close()
+    return frame_times, game.goals_reached
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Maze game")
+    parser.add_argument('--input', choices=['keyboard', 'ipc'], default='keyboard',
+                        help="ipc: take directions from pose_controller_v2.py --output ipc")
+    parser.add_argument('--generator', choices=list(GENERATORS), default=GENERATOR,
+                        help="Maze generation algorithm")
+    parser.add_argument('--difficulty', choices=BANDS, help="Pick mazes of this difficulty from the maze library")
+    parser.add_argument('--seed', type=int, help="Play the maze with this seed every time")
+    parser.add_argument('--verbose', action='store_true', help="Print each maze's seed, to replay it with --seed")
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help="Render rate cap, 0 for uncapped; the game runs at the same speed either way")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Save per-phase frame timings to a .csv or .npy file (F3 shows them live)")
+    parser.add_argument('--endless', action='store_true',
+                        help="A maze that never ends, with each goal further away than the last")
+    parser.add_argument('--trace', metavar='PATH', help="Record per-stage latency timestamps (with --input ipc)")
+    args = parser.parse_args()
+
+    GENERATOR = args.generator
+    DIFFICULTY = args.difficulty
+    MAZE_SEED = args.seed
+    VERBOSE = args.verbose
+    if DIFFICULTY and not LIBRARY.matches(cols, rows, end_point, GENERATOR):
+        print(f"No {GENERATOR} maze library for this maze size; ignoring --difficulty "
+              f"(python maze_library.py build --generator {GENERATOR})")
+    tracer = Tracer(args.trace) if args.trace else None
+    input_source = IpcInput(tracer=tracer) if args.input == 'ipc' else KeyboardInput()
+    profiler = FrameProfiler(PROFILE_PHASES, export_path=args.profile) if args.profile else None
+    try:
+        if args.endless:
+            main_endless(input_source=input_source, fps=args.fps, tracer=tracer, profiler=profiler)
+        else:
+            main(input_source=input_source, fps=args.fps, tracer=tracer, profiler=profiler)
+    finally:
+        if tracer is not None:
+            tracer.close()  # Flushes the write buffer
@@ -0,0 +1,174 @@
+"""Library of pre-generated, pre-solved mazes, memory-mapped from .npy files.
+
+    python maze_library.py build --count 20000
+    python maze_library.py info
+
+Each entry holds the maze's walls, its distance field and next-hop table to
+the goal, and difficulty metrics. Entries are stored sorted by difficulty,
+so a difficulty band is just a range of entries and picking a maze from one
+costs a random number and a few array reads. The mazes come from consecutive
+seeds, and entries.npy maps each seed to its entry for ``--seed`` lookups.
+"""
+import argparse
+import json
+import os
+import random
+
+import numpy as np
+
+from maze_array import MazeGrid, DistanceField
+from maze_generators import GENERATORS, generate
+
+LIBRARY_PATH = "mazes"
+BANDS = ('easy', 'medium', 'hard')
+
+METRICS = np.dtype([
+    ('seed', '<u8'),
+    ('path_length', '<u4'),  # Steps from the start to the goal
+    ('dead_ends', '<u4'),    # Cells with a single opening
+    ('turns', '<u4'),        # Changes of direction along the solution
+    ('difficulty', '<f4'),
+])
+
+
+def measure(maze_grid, distance_field, start=0):
+    """Path length, dead-end count and turn count of a solved maze, plus a combined difficulty score."""
+    bits = np.unpackbits(maze_grid.walls[..., None], axis=-1)[..., 4:].sum(axis=-1)
+    dead_ends = int(np.count_nonzero(bits == 3))
+    path = np.array([x + y * maze_grid.cols for x, y in distance_field.path_from(start)])
+    steps = np.diff(path)
+    turns = int(np.count_nonzero(steps[1:] != steps[:-1]))
+    path_length = len(steps)
+    # Long routes with many turns are hard, and every dead end is a chance to get lost
+    difficulty = path_length + 2 * turns + dead_ends / 2
+    return path_length, dead_ends, turns, difficulty
+
+
+class MazeLibrary:
+    """A directory of .npy arrays, one row per maze, plus an index.json describing them."""
+
+    def __init__(self, path=LIBRARY_PATH):
+        self.path = path
+        self._index = None
+        self._arrays = {}
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @property
+    def index(self):
+        if self._index is None:
+            with open(self._file('index.json')) as f:
+                self._index = json.load(f)
+        return self._index
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self._file(f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    def exists(self):
+        return os.path.exists(self._file('index.json'))
+
+    def matches(self, cols, rows, end, generator=None):
+        """Whether the library holds mazes of this size solved towards ``end``, made by ``generator`` if given."""
+        return (self.exists() and self.index['cols'] == cols and self.index['rows'] == rows
+                and tuple(self.index['end']) == tuple(end)
+                and (generator is None or self.index['generator'] == generator))
+
+    def __len__(self):
+        return self.index['count']
+
+    @property
+    def metrics(self):
+        return self._array('metrics')
+
+    def band(self, name):
+        """Range of entries in difficulty band ``name``."""
+        start, stop = self.index['bands'][name]
+        return range(start, stop)
+
+    def find(self, seed):
+        """Entry number of the maze generated from ``seed``, or None."""
+        if 'first_seed' not in self.index:
+            # Built before seeds were indexed
+            found = np.flatnonzero(self.metrics['seed'] == seed)
+            return int(found[0]) if len(found) else None
+        number = seed - self.index['first_seed']
+        if not 0 <= number < len(self):
+            return None
+        return int(self._array('entries')[number])
+
+    def entry(self, number):
+        """``(seed, MazeGrid, DistanceField)`` for entry ``number``."""
+        cols, rows = self.index['cols'], self.index['rows']
+        # The walls are copied so the game can't write through to the file
+        maze = MazeGrid(cols, rows, np.array(self._array('walls')[number]))
+        distance_field = DistanceField(cols, self._array('distance')[number], self._array('next_hop')[number])
+        return int(self.metrics['seed'][number]), maze, distance_field
+
+    def pick(self, band=None, rng=random):
+        """A random entry, from difficulty band ``band`` if given."""
+        entries = self.band(band) if band is not None else range(len(self))
+        return self.entry(rng.choice(entries))
+
+    @classmethod
+    def build(cls, path, count, cols, rows, end, generator='backtracker', first_seed=0):
+        """Generate and solve ``count`` mazes from consecutive seeds and write them to ``path``."""
+        os.makedirs(path, exist_ok=True)
+        cells = cols * rows
+        hop_type = np.int16 if cells < 2**15 else np.int32
+        walls = np.empty((count, rows, cols), dtype=np.uint8)
+        distance = np.empty((count, cells), dtype=hop_type)
+        next_hop = np.empty((count, cells), dtype=hop_type)
+        metrics = np.empty(count, dtype=METRICS)
+        for number in range(count):
+            seed = first_seed + number
+            maze = generate(generator, cols, rows, seed)
+            field = maze.distance_field(end)
+            walls[number] = maze.walls
+            distance[number] = field.distance
+            next_hop[number] = field.next_hop
+            metrics[number] = (seed, *measure(maze, field))
+
+        order = np.argsort(metrics['difficulty'], kind='stable')
+        for name, array in (('walls', walls), ('distance', distance), ('next_hop', next_hop), ('metrics', metrics)):
+            np.save(os.path.join(path, f'{name}.npy'), array[order])
+        # Entry number of each seed from first_seed on, so find() is a single lookup
+        np.save(os.path.join(path, 'entries.npy'), np.argsort(order).astype(np.int32))
+
+        # Equal thirds from easiest to hardest
+        edges = [round(count * i / len(BANDS)) for i in range(len(BANDS) + 1)]
+        index = {
+            'cols': cols, 'rows': rows, 'end': list(end), 'count': count, 'generator': generator,
+            'first_seed': first_seed,
+            'bands': {name: [edges[i], edges[i + 1]] for i, name in enumerate(BANDS)},
+        }
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump(index, f, indent=2)
+        return cls(path)
+
+
+if __name__ == "__main__":
+    import maze_game
+
+    parser = argparse.ArgumentParser(description="Build or inspect the maze library.")
+    parser.add_argument("action", choices=["build", "info"])
+    parser.add_argument("--path", default=LIBRARY_PATH)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--generator", choices=list(GENERATORS), default=maze_game.GENERATOR)
+    parser.add_argument("--first-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.action == "build":
+        library = MazeLibrary.build(args.path, args.count, maze_game.cols, maze_game.rows, maze_game.end_point,
+                                    args.generator, args.first_seed)
+        print(f"Built {len(library)} mazes in {args.path}")
+    else:
+        library = MazeLibrary(args.path)
+        print(f"{len(library)} {library.index['cols']}x{library.index['rows']} mazes "
+              f"from the {library.index['generator']} generator")
+        for band in BANDS:
+            metrics = library.metrics[library.band(band).start:library.band(band).stop]
+            print(f"{band:<7} {len(metrics):>7} mazes, path length {metrics['path_length'].mean():.1f}, "
+                  f"dead ends {metrics['dead_ends'].mean():.1f}, turns {metrics['turns'].mean():.1f}")
@@ -0,0 +1,107 @@
+import pygame
+
+from maze_array import WALL_CORNERS
+
+
+def draw_walls(surface, maze_grid, tile, thickness, color=pygame.Color('darkorange')):
+    for x, y, side in maze_grid.wall_segments():
+        (x0, y0), (x1, y1) = WALL_CORNERS[side]
+        pygame.draw.line(surface, color,
+                         ((x + x0) * tile, (y + y0) * tile), ((x + x1) * tile, (y + y1) * tile), thickness)
+
+
+class MazeRenderer:
+    """Keeps the static maze layer on an off-screen Surface and repaints only dirty rects.
+
+    The walls and goal tile are drawn once per maze by ``build()``. Each frame,
+    ``begin_frame()`` restores the background under whatever was drawn last
+    frame, the caller draws the moving parts and reports their rects with
+    ``mark()``, and ``present()`` pushes just those areas to the display.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.previous_rects = []
+        self.frame_rects = []
+        self.full_redraw = True
+
+    def build(self, maze_grid, end_point, tile, thickness):
+        self.background.fill(pygame.Color('black'))
+        pygame.draw.rect(self.background, pygame.Color('red'),
+                         (end_point[0] * tile + 10, end_point[1] * tile + 10, tile - 20, tile - 20))
+        draw_walls(self.background, maze_grid, tile, thickness)
+        # Mid-frame rebuilds (restarts) come after begin_frame() painted the old maze
+        self.screen.blit(self.background, (0, 0))
+        self.full_redraw = True
+
+    def begin_frame(self, full_redraw=False):
+        """Erase last frame's dynamic drawing; ``full_redraw`` repaints the whole screen."""
+        self.full_redraw = self.full_redraw or full_redraw
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                self.screen.blit(self.background, rect, rect)
+        self.frame_rects = []
+
+    def mark(self, *rects):
+        self.frame_rects.extend(rects)
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous_rects + self.frame_rects)
+        self.previous_rects = self.frame_rects
+        self.full_redraw = False
+
+
+class PathOverlay:
+    """The dotted route to the goal, drawn onto a cached Surface only when the route changes.
+
+    ``draw()`` is given a key that identifies the route, such as the player's
+    tile and the maze's distance field; while the key stays the same each frame
+    costs one blit rather than a draw call per dot.
+    """
+
+    def __init__(self, tile, color=pygame.Color('limegreen'), spacing=10, radius=2):
+        self.tile = tile
+        self.color = color
+        self.spacing = spacing
+        self.radius = radius
+        self.key = None
+        self.surface = None
+        self.rect = None
+
+    def _render(self, path):
+        if len(path) < 2:
+            self.surface = self.rect = None
+            return
+        tile, radius = self.tile, self.radius
+        points = [(x * tile + tile // 2, y * tile + tile // 2) for x, y in path]
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        self.rect = pygame.Rect(min(xs) - radius, min(ys) - radius,
+                                max(xs) - min(xs) + 2 * radius + 1, max(ys) - min(ys) + 2 * radius + 1)
+        self.surface = pygame.Surface(self.rect.size).convert()
+        self.surface.set_colorkey((0, 0, 0))
+        left, top = self.rect.topleft
+        # Neighbouring cells are always a tile apart, so every segment has the same dots
+        num_dots = tile // self.spacing
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            for j in range(num_dots):
+                t = j / num_dots
+                pygame.draw.circle(self.surface, self.color,
+                                   (int(x0 + t * (x1 - x0)) - left, int(y0 + t * (y1 - y0)) - top), radius)
+
+    def draw(self, screen, key, get_path, offset=(0, 0)):
+        """Blit the route, calling ``get_path()`` to redraw it only if ``key`` changed.
+
+        Returns the screen rect drawn, or None if there is no route to show.
+        """
+        if key != self.key:
+            self._render(get_path())
+            self.key = key
+        if self.surface is None:
+            return None
+        return screen.blit(self.surface, self.rect.move(offset))
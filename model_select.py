@@ -0,0 +1,192 @@
+"""Pick the most accurate pose model this machine can run fast enough.
+
+    python model_select.py --download          # fetch lite, full and heavy, then benchmark
+    python model_select.py --refresh           # re-benchmark the models already downloaded
+    python model_select.py --sample clip.mp4   # benchmark on a recording instead of the camera
+
+Each downloaded variant is timed in VIDEO mode on frames from the camera (or
+``--sample``), and the most accurate one whose p90 latency and frame rate meet
+the targets wins. The choice is cached per CPU, so pose_controller_v2.py only
+benchmarks on the first run on a new machine.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+
+MODEL_DIR = 'models'
+# Most accurate first
+VARIANTS = ('heavy', 'full', 'lite')
+MODEL_URL = ('https://storage.googleapis.com/mediapipe-models/pose_landmarker/'
+             'pose_landmarker_{0}/float16/latest/pose_landmarker_{0}.task')
+# Where pose_controller_v2.py has always downloaded the lite model
+LEGACY_LITE_PATH = os.path.join(MODEL_DIR, 'pose_landmarker.task')
+CHOICE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'maze_pose', 'model_choice.json')
+
+TARGET_LATENCY_MS = 50.0
+TARGET_FPS = 20.0
+
+
+def model_path(variant, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f'pose_landmarker_{variant}.task')
+
+
+def ensure_model(variant, model_dir=MODEL_DIR):
+    """Path to ``variant``, downloading it first if it isn't cached."""
+    path = model_path(variant, model_dir)
+    if not os.path.exists(path):
+        print(f"Downloading {variant} model...")
+        os.makedirs(model_dir, exist_ok=True)
+        urllib.request.urlretrieve(MODEL_URL.format(variant), path)
+    return path
+
+
+def cached_models(model_dir=MODEL_DIR):
+    """``{variant: path}`` of the models already on disk."""
+    models = {variant: model_path(variant, model_dir) for variant in VARIANTS}
+    models = {variant: path for variant, path in models.items() if os.path.exists(path)}
+    if 'lite' not in models and model_dir == MODEL_DIR and os.path.exists(LEGACY_LITE_PATH):
+        models['lite'] = LEGACY_LITE_PATH
+    return models
+
+
+def cpu_key():
+    """Identifies the CPU, so a cached choice isn't reused on a different machine."""
+    name = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    name = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return f"{platform.system()}|{platform.machine()}|{name}|{os.cpu_count()}"
+
+
+def sample_frames(source=0, count=40, size=(320, 240)):
+    """Frames to benchmark on, at the controller's camera size.
+
+    ``source`` is a camera index or a video or image path. Without a person in
+    view only the detector runs, so a recording of someone playing gives the
+    fairest numbers.
+    """
+    frames = []
+    image = cv2.imread(source) if isinstance(source, str) else None
+    if image is not None:
+        frames = [image] * count
+    else:
+        cap = cv2.VideoCapture(source)
+        while cap.isOpened() and len(frames) < count:
+            success, frame = cap.read()
+            if not success:
+                break
+            frames.append(frame)
+        cap.release()
+    if not frames:
+        print(f"Couldn't read frames from {source!r}; benchmarking on a blank image")
+        frames = [np.full((size[1], size[0], 3), 127, dtype=np.uint8)] * count
+    return [cv2.resize(frame, size) for frame in frames]
+
+
+def benchmark(path, frames, warmup=5):
+    """Time ``detect_for_video`` on each frame; returns latency and detection stats."""
+    import mediapipe as mp
+
+    options = mp.tasks.vision.PoseLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(model_asset_path=path),
+        running_mode=mp.tasks.vision.RunningMode.VIDEO,
+        num_poses=1,
+    )
+    latencies_ms = []
+    detected = 0
+    with mp.tasks.vision.PoseLandmarker.create_from_options(options) as landmarker:
+        for i, frame in enumerate(frames):
+            image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            start = time.perf_counter_ns()
+            result = landmarker.detect_for_video(image, i * 33)
+            if i >= warmup:
+                latencies_ms.append((time.perf_counter_ns() - start) / 1e6)
+                detected += bool(result.pose_landmarks)
+    mean = float(np.mean(latencies_ms))
+    return {
+        'p90_ms': float(np.percentile(latencies_ms, 90)),
+        'mean_ms': mean,
+        'fps': 1000.0 / mean,
+        'detected': detected / len(latencies_ms),
+    }
+
+
+def choose(results, target_latency_ms=TARGET_LATENCY_MS, target_fps=TARGET_FPS):
+    """The most accurate variant meeting both targets, or the fastest if none does."""
+    for variant in VARIANTS:
+        stats = results.get(variant)
+        if stats and stats['p90_ms'] <= target_latency_ms and stats['fps'] >= target_fps:
+            return variant
+    return min(results, key=lambda variant: results[variant]['mean_ms'])
+
+
+def _load_cache():
+    try:
+        with open(CHOICE_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def select_model(model_dir=MODEL_DIR, target_latency_ms=TARGET_LATENCY_MS, target_fps=TARGET_FPS,
+                 refresh=False, sample=0):
+    """Path of the model to use on this machine, or None if no model has been downloaded.
+
+    Reuses the cached choice for this CPU unless ``refresh`` is set, or the
+    targets or the set of downloaded models have changed since it was made.
+    """
+    models = cached_models(model_dir)
+    if not models:
+        return None
+    key = cpu_key()
+    settings = {'models': sorted(models), 'target_latency_ms': target_latency_ms, 'target_fps': target_fps}
+    cache = _load_cache()
+    entry = cache.get(key)
+    if not refresh and entry is not None and entry['settings'] == settings:
+        return models[entry['variant']]
+
+    print("Benchmarking pose models on this machine...")
+    frames = sample_frames(sample)
+    results = {}
+    for variant, path in models.items():
+        results[variant] = benchmark(path, frames)
+        stats = results[variant]
+        print(f"  {variant:<6} p90 {stats['p90_ms']:6.1f} ms, {stats['fps']:6.1f} fps, "
+              f"pose found in {stats['detected']:.0%} of frames")
+    variant = choose(results, target_latency_ms, target_fps)
+    print(f"Using the {variant} model")
+
+    cache[key] = {'variant': variant, 'settings': settings, 'results': results}
+    os.makedirs(os.path.dirname(CHOICE_CACHE_PATH), exist_ok=True)
+    with open(CHOICE_CACHE_PATH, 'w') as f:
+        json.dump(cache, f, indent=2)
+    return models[variant]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pose models and pick one for this machine.")
+    parser.add_argument('--download', action='store_true', help="Download any missing lite/full/heavy models first")
+    parser.add_argument('--refresh', action='store_true', help="Benchmark again even if a choice is cached")
+    parser.add_argument('--sample', default=0,
+                        help="Camera index, video or image to benchmark on (default: camera 0)")
+    parser.add_argument('--latency', type=float, default=TARGET_LATENCY_MS, help="Target p90 latency in ms")
+    parser.add_argument('--fps', type=float, default=TARGET_FPS, help="Target frame rate")
+    args = parser.parse_args()
+
+    if args.download:
+        for variant in VARIANTS:
+            ensure_model(variant)
+    sample = int(args.sample) if str(args.sample).isdigit() else args.sample
+    path = select_model(target_latency_ms=args.latency, target_fps=args.fps, refresh=args.refresh, sample=sample)
+    print(path or "No models downloaded yet; run with --download")
@@ -0,0 +1,203 @@
+"""Shortest paths on a MazeGrid, without the game's globals.
+
+    from pathfinding import astar, BatchSolver
+    path = astar(maze, (0, 0), (cols - 1, rows - 1))
+    paths = BatchSolver(maze).paths([((0, 0), (5, 3)), ((2, 2), (0, 6))])
+
+Cells are ``(x, y)`` tuples and every function returns the path as a list of
+cells from start to goal, or ``[]`` if the goal can't be reached. The searches
+keep one parent per cell in flat arrays indexed by ``x + y * cols``, so memory
+is linear in the maze size however long the path is.
+"""
+import heapq
+from array import array
+from collections import deque
+
+from maze_array import BOTTOM, LEFT, RIGHT, TOP
+
+
+def _moves(cols):
+    return ((TOP, -cols), (RIGHT, 1), (BOTTOM, cols), (LEFT, -1))
+
+
+def _trace(parent, cols, start, goal):
+    """Follow ``parent`` from ``goal`` back to ``start`` and return the cells in start-to-goal order."""
+    path = [goal]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return [(index % cols, index // cols) for index in path]
+
+
+def bfs(maze_grid, start, goal):
+    """Breadth-first search, stopping as soon as the goal is reached."""
+    cols = maze_grid.cols
+    walls = maze_grid.walls.tobytes()
+    moves = _moves(cols)
+    start, goal = start[0] + start[1] * cols, goal[0] + goal[1] * cols
+    parent = array('i', [-1]) * len(walls)
+    parent[start] = start
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        if index == goal:
+            return _trace(parent, cols, start, goal)
+        cell = walls[index]
+        for wall, step in moves:
+            if not cell & wall:
+                neighbor = index + step
+                if parent[neighbor] == -1:
+                    parent[neighbor] = index
+                    queue.append(neighbor)
+    return []
+
+
+def astar(maze_grid, start, goal):
+    """A* with the Manhattan distance as heuristic, preferring deeper cells on ties."""
+    cols = maze_grid.cols
+    walls = maze_grid.walls.tobytes()
+    moves = _moves(cols)
+    goal_x, goal_y = goal
+    start, goal = start[0] + start[1] * cols, goal_x + goal_y * cols
+    cost = array('i', [-1]) * len(walls)
+    parent = array('i', [-1]) * len(walls)
+    cost[start] = 0
+    parent[start] = start
+    heap = [(0, 0, start)]
+    while heap:
+        _, negative_cost, index = heapq.heappop(heap)
+        if index == goal:
+            return _trace(parent, cols, start, goal)
+        if -negative_cost > cost[index]:
+            continue  # Already reached more cheaply
+        new_cost = cost[index] + 1
+        cell = walls[index]
+        for wall, step in moves:
+            if not cell & wall:
+                neighbor = index + step
+                if cost[neighbor] == -1 or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = index
+                    y, x = divmod(neighbor, cols)
+                    heapq.heappush(heap, (new_cost + abs(x - goal_x) + abs(y - goal_y), -new_cost, neighbor))
+    return []
+
+
+def bidirectional(maze_grid, start, goal):
+    """Breadth-first search from both ends at once, always growing the smaller frontier by a whole level."""
+    cols = maze_grid.cols
+    walls = maze_grid.walls.tobytes()
+    moves = _moves(cols)
+    start, goal = start[0] + start[1] * cols, goal[0] + goal[1] * cols
+    if start == goal:
+        return [(start % cols, start // cols)]
+
+    sides = []
+    for origin in (start, goal):
+        distance = array('i', [-1]) * len(walls)
+        parent = array('i', [-1]) * len(walls)
+        distance[origin] = 0
+        parent[origin] = origin
+        sides.append((distance, parent, [origin]))
+
+    while sides[0][2] and sides[1][2]:
+        grow = 0 if len(sides[0][2]) <= len(sides[1][2]) else 1
+        distance, parent, frontier = sides[grow]
+        other_distance = sides[1 - grow][0]
+        next_frontier = []
+        best, meet = None, -1
+        for index in frontier:
+            cell = walls[index]
+            for wall, step in moves:
+                if not cell & wall:
+                    neighbor = index + step
+                    if distance[neighbor] == -1:
+                        distance[neighbor] = distance[index] + 1
+                        parent[neighbor] = index
+                        next_frontier.append(neighbor)
+                        if other_distance[neighbor] != -1:
+                            # Finish the level: a later meeting point may still be shorter
+                            length = distance[neighbor] + other_distance[neighbor]
+                            if best is None or length < best:
+                                best, meet = length, neighbor
+        if meet != -1:
+            forward = _trace(sides[0][1], cols, start, meet)
+            backward = _trace(sides[1][1], cols, goal, meet)
+            return forward + backward[-2::-1]
+        sides[grow] = (distance, parent, next_frontier)
+    return []
+
+
+class BatchSolver:
+    """Answers many ``(start, goal)`` queries on one maze, sharing the work between them.
+
+    In a perfect maze the passages form a tree, so a single search from the
+    corner gives every cell's parent and depth, and each query is just a climb
+    from both ends to where they meet. Mazes with loops fall back to one
+    distance field per distinct goal.
+    """
+
+    def __init__(self, maze_grid):
+        self.maze_grid = maze_grid
+        self.cols = maze_grid.cols
+        walls = maze_grid.walls
+        passages = int(((walls[:, :-1] & RIGHT) == 0).sum() + ((walls[:-1] & BOTTOM) == 0).sum())
+        tree = maze_grid.distance_field((0, 0))
+        self.perfect = passages == walls.size - 1 and bool((tree.distance >= 0).all())
+        if self.perfect:
+            self.depth = tree.distance.tolist()
+            self.parent = tree.next_hop.tolist()
+        self.fields = {}
+
+    def path(self, start, goal):
+        cols = self.cols
+        if not self.perfect:
+            field = self.fields.get(goal)
+            if field is None:
+                field = self.fields[goal] = self.maze_grid.distance_field(goal)
+            return field.path_from(start[0] + start[1] * cols)
+
+        depth, parent = self.depth, self.parent
+        a, b = start[0] + start[1] * cols, goal[0] + goal[1] * cols
+        from_start, from_goal = [], []
+        while depth[a] > depth[b]:
+            from_start.append(a)
+            a = parent[a]
+        while depth[b] > depth[a]:
+            from_goal.append(b)
+            b = parent[b]
+        while a != b:
+            from_start.append(a)
+            from_goal.append(b)
+            a, b = parent[a], parent[b]
+        from_start.append(a)
+        from_start.extend(reversed(from_goal))
+        return [(index % cols, index // cols) for index in from_start]
+
+    def paths(self, queries):
+        """Paths for an iterable of ``(start, goal)`` pairs, generated in order."""
+        for start, goal in queries:
+            yield self.path(start, goal)
+
+    def distance(self, start, goal):
+        """Number of steps between two cells, or -1 if there is no path, without building the path."""
+        cols = self.cols
+        if not self.perfect:
+            field = self.fields.get(goal)
+            if field is None:
+                field = self.fields[goal] = self.maze_grid.distance_field(goal)
+            return int(field.distance[start[0] + start[1] * cols])
+
+        depth, parent = self.depth, self.parent
+        a, b = start[0] + start[1] * cols, goal[0] + goal[1] * cols
+        steps = 0
+        while depth[a] > depth[b]:
+            a = parent[a]
+            steps += 1
+        while depth[b] > depth[a]:
+            b = parent[b]
+            steps += 1
+        while a != b:
+            a, b = parent[a], parent[b]
+            steps += 2
+        return steps
@@ -0,0 +1,114 @@
+import copy
+
+import cv2
+
+
+class AdaptiveSampler:
+    """Chooses which camera frames go to pose detection, and how much of each one.
+
+    Three savings, applied in the pose pipeline's inference stage:
+
+    - Motion gate: a tiny grayscale thumbnail of each frame is compared with the
+      last frame that was inferred. If the mean difference is below
+      ``motion_threshold`` the frame is skipped, but never for longer than
+      ``max_skip_interval`` seconds, so a still player is still tracked.
+    - Region of interest: the frame is cropped to the last detected pose's
+      bounding box, padded by ``roi_margin``. If no pose is found, it falls back
+      to the full frame.
+    - Downscale: the crop is resized so its longer side is at most ``max_side``
+      pixels. The landmark model runs at 256x256, so more detail than that is
+      thrown away anyway.
+
+    Results come back relative to the crop; ``remap`` puts them back into
+    full-frame coordinates so ``check_inputs`` and the thresholds are unaffected.
+    """
+
+    def __init__(self, max_side=256, roi_margin=0.35, min_roi=0.4,
+                 motion_threshold=3.0, max_skip_interval=0.25, thumbnail_size=(32, 24)):
+        self.max_side = max_side
+        self.roi_margin = roi_margin
+        self.min_roi = min_roi
+        self.motion_threshold = motion_threshold
+        self.max_skip_interval_ms = max_skip_interval * 1000
+        self.thumbnail_size = thumbnail_size
+
+        self.roi = (0.0, 0.0, 1.0, 1.0)  # left, top, right, bottom as fractions of the frame
+        self.last_thumbnail = None
+        self.last_inferred_ms = None
+        self.crops = {}  # timestamp_ms -> roi used for that frame
+        self.skipped = 0
+        self.inferred = 0
+
+    def prepare(self, bgr_frame, timestamp_ms):
+        """RGB image to run detection on for this frame, or None to skip it."""
+        thumbnail = cv2.resize(cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2GRAY), self.thumbnail_size,
+                               interpolation=cv2.INTER_AREA)
+        if (self.last_thumbnail is not None
+                and timestamp_ms - self.last_inferred_ms < self.max_skip_interval_ms
+                and cv2.absdiff(thumbnail, self.last_thumbnail).mean() < self.motion_threshold):
+            self.skipped += 1
+            return None
+        self.last_thumbnail = thumbnail
+        self.last_inferred_ms = timestamp_ms
+        self.inferred += 1
+
+        h, w, _ = bgr_frame.shape
+        left, top, right, bottom = self.roi
+        x0, y0 = int(left * w), int(top * h)
+        x1, y1 = max(x0 + 1, int(right * w)), max(y0 + 1, int(bottom * h))
+        crop = bgr_frame[y0:y1, x0:x1]
+        scale = self.max_side / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))),
+                              interpolation=cv2.INTER_AREA)
+
+        # Only the newest few crops can still have results in flight
+        if len(self.crops) > 32:
+            for old in sorted(self.crops)[:-16]:
+                self.crops.pop(old, None)  # remap() pops from the result thread
+        self.crops[timestamp_ms] = (x0 / w, y0 / h, x1 / w, y1 / h)
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+
+    def remap(self, result, timestamp_ms):
+        """Map a crop-relative result back to the full frame and re-centre the ROI on it.
+
+        Returns None if the crop for ``timestamp_ms`` was already pruned, as
+        its coordinates can't be mapped back.
+        """
+        crop = self.crops.pop(timestamp_ms, None)
+        if crop is None:
+            return None
+        left, top, right, bottom = crop
+        width, height = right - left, bottom - top
+        poses = []
+        for pose_landmarks in result.pose_landmarks:
+            remapped = []
+            for landmark in pose_landmarks:
+                landmark = copy.copy(landmark)
+                landmark.x = left + landmark.x * width
+                landmark.y = top + landmark.y * height
+                remapped.append(landmark)
+            poses.append(remapped)
+        result = copy.copy(result)
+        result.pose_landmarks = poses
+        self._track(poses)
+        return result
+
+    def _track(self, poses):
+        if not poses:
+            self.roi = (0.0, 0.0, 1.0, 1.0)
+            return
+        xs = [landmark.x for landmark in poses[0]]
+        ys = [landmark.y for landmark in poses[0]]
+        left, right = self._span(min(xs), max(xs))
+        top, bottom = self._span(min(ys), max(ys))
+        self.roi = (left, top, right, bottom)
+
+    def _span(self, low, high):
+        """Pad ``[low, high]`` by the margin, widen it to ``min_roi`` and clamp it to the frame."""
+        pad = (high - low) * self.roi_margin
+        low, high = low - pad, high + pad
+        if high - low < self.min_roi:
+            middle = (low + high) / 2
+            low, high = middle - self.min_roi / 2, middle + self.min_roi / 2
+        return max(0.0, low), min(1.0, high)
@@ -1,16 +1,14 @@
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
+import json
 import urllib.request
 import os
 import cv2
-import time
-import numpy as np
-from mediapipe.framework.formats import landmark_pb2
 import sys
-import keyboard
-import subprocess
-import pyttsx3
+from concurrent.futures import ThreadPoolExecutor
+from pose_pipeline import PosePipeline
+from pose_adaptive import AdaptiveSampler
+from direction_ipc import DirectionSender
+from latency_trace import Tracer
+from model_select import VARIANTS, ensure_model, select_model
 
 
 
@@ -26,13 +24,46 @@ else:
 # -------------------------------
 MODEL_URL = 'https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task'
 MODEL_PATH = 'models/pose_landmarker.task'
+CAMERA_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'maze_pose', 'cameras.json')
+
+
+def probe_cameras(refresh=False, max_cameras=5):
+    """Indices of the cameras that can be opened.
+
+    Opening each camera takes up to a second, so the answer is cached on disk
+    and only re-probed when ``refresh`` is set.
+    """
+    if not refresh:
+        try:
+            with open(CAMERA_CACHE_PATH) as f:
+                return json.load(f)['available']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    available = []
+    for i in range(max_cameras):
+        cap = cv2.VideoCapture(i)
+        if cap.isOpened():
+            available.append(i)
+        cap.release()
+    os.makedirs(os.path.dirname(CAMERA_CACHE_PATH), exist_ok=True)
+    with open(CAMERA_CACHE_PATH, 'w') as f:
+        json.dump({'available': available}, f)
+    return available
+
 
 class PoseInputController:
     def __init__(self,
                  camera_width=320, camera_height=240,
                  left_threshold=0.45, right_threshold=1.0-0.4,
                  up_threshold=0.55, down_threshold=1.0-0.3,
-                 single_trigger=True):
+                 single_trigger=True, output='keyboard',
+                 capture=0, model_path=MODEL_PATH, tracer=None, refresh_cameras=False):
+        """``capture`` is a camera index to open, an already opened ``cv2.VideoCapture``
+        (e.g. of a recorded video) or None for no camera; ``model_path=None`` skips
+        creating the landmarker. ``output`` is 'keyboard', 'ipc' or 'none'. ``tracer`` is an
+        optional latency_trace.Tracer; ``refresh_cameras`` re-probes the cameras instead of
+        trusting the cached list."""
         self.camera_width = camera_width
         self.camera_height = camera_height
         self.left_threshold = left_threshold
@@ -41,51 +72,74 @@ class PoseInputController:
         self.down_threshold = down_threshold
         self.single_trigger = single_trigger
 
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', 150)
+        self._tts_engine = None
 
         self.triggered_right = False
         self.triggered_left = False
         self.triggered_up = False
         self.triggered_down = False
         self.current_key = None  # Track currently pressed key
+        # 'ipc' sends directions straight to maze_game.py --input ipc instead of pressing keys,
+        # 'none' only records them in self.events
+        self.output = output
+        self.sender = DirectionSender() if output == 'ipc' else None
+        self.tracer = tracer
 
         self.events = []
 
-        # print all cameras available
-        print("Available cameras:")
-        for i in range(5):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                print(f"Camera {i} is available")
-                cap.release()
+        self.latest_result = None
+        # Set by PosePipeline to hand results to its gesture stage; returns the result to keep
+        self.on_result = None
+
+        # Load the model while the camera opens; both take a second or two
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            landmarker = pool.submit(self.create_landmarker, model_path) if model_path is not None else None
+
+            if isinstance(capture, int):
+                # print all cameras available
+                available = probe_cameras(refresh=refresh_cameras)
+                print("Available cameras:", ", ".join(map(str, available)) or "none")
+
+                self.cap = cv2.VideoCapture(capture)
+
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_width)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_height)
+                if not self.cap.isOpened():
+                    raise RuntimeError("Cannot open camera (try --probe-cameras to refresh the list)")
+                print("Camera initialized")
             else:
-                print(f"Camera {i} is not available")
+                self.cap = capture
 
-        self.cap = cv2.VideoCapture(0)
+            self.landmarker = landmarker.result() if landmarker is not None else None
 
+        self.STICK_CONNECTIONS = [
+            (0, 11), (0, 12), (11, 12),
+            (11, 13), (13, 15), (12, 14),
+            (14, 16), (11, 23), (12, 24),
+            (23, 24), (23, 25), (25, 27),
+            (24, 26), (26, 28)
+        ]
 
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_height)
-        if not self.cap.isOpened():
-            raise RuntimeError("Cannot open camera")
-        print("Camera initialized")
+    def create_landmarker(self, model_path):
+        import mediapipe as mp  # Slow to import, so it loads alongside the camera
 
-        if not os.path.exists(MODEL_PATH):
+        if not os.path.exists(model_path):
             print("Downloading model...")
-            urllib.request.urlretrieve(MODEL_URL, MODEL_PATH)
+            os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+            urllib.request.urlretrieve(MODEL_URL, model_path)
 
         BaseOptions = mp.tasks.BaseOptions
         PoseLandmarker = mp.tasks.vision.PoseLandmarker
         PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
         VisionRunningMode = mp.tasks.vision.RunningMode
 
-        def process_result(result: mp.tasks.vision.PoseLandmarkerResult, *args):
+        def process_result(result: mp.tasks.vision.PoseLandmarkerResult, output_image, timestamp_ms):
+            if self.on_result is not None:
+                result = self.on_result(result, timestamp_ms)
             self.latest_result = result
 
-        self.latest_result = None
         options = PoseLandmarkerOptions(
-            base_options=BaseOptions(model_asset_path=MODEL_PATH),
+            base_options=BaseOptions(model_asset_path=model_path),
             running_mode=VisionRunningMode.LIVE_STREAM,
             num_poses=1,
             min_pose_detection_confidence=0.5,
@@ -94,15 +148,16 @@ class PoseInputController:
             result_callback=process_result,
             output_segmentation_masks=False
         )
-        self.landmarker = PoseLandmarker.create_from_options(options)
+        return PoseLandmarker.create_from_options(options)
 
-        self.STICK_CONNECTIONS = [
-            (0, 11), (0, 12), (11, 12),
-            (11, 13), (13, 15), (12, 14),
-            (14, 16), (11, 23), (12, 24),
-            (23, 24), (23, 25), (25, 27),
-            (24, 26), (26, 28)
-        ]
+    @property
+    def tts_engine(self):
+        """Started on first use: pyttsx3 is slow to initialise and speak() is muted."""
+        if self._tts_engine is None:
+            import pyttsx3
+            self._tts_engine = pyttsx3.init()
+            self._tts_engine.setProperty('rate', 150)
+        return self._tts_engine
 
     def speak(self, text):
         # self.tts_engine.say(text)
@@ -142,7 +197,30 @@ class PoseInputController:
                 cv2.line(image, landmark_coords[start_idx], landmark_coords[end_idx], color, thickness)
         return image
 
-    def check_inputs(self, pose_landmarks):
+    def press(self, key, event_id=None):
+        """Hold down ``key`` in place of the previous one, or send it over IPC.
+
+        ``event_id`` is the camera frame that triggered it, for latency tracing.
+        """
+        if self.tracer is not None and event_id is not None:
+            self.tracer.stamp(event_id, 'trigger')
+        if self.sender is not None:
+            self.sender.send(key.upper(), event_id)
+            return
+        if self.output == 'none':
+            return
+        import keyboard  # Needs root on Linux, so only imported when keys are actually pressed
+        self.release()
+        keyboard.press(key)
+        self.current_key = key
+
+    def release(self):
+        if self.current_key is not None:
+            import keyboard
+            keyboard.release(self.current_key)
+            self.current_key = None
+
+    def check_inputs(self, pose_landmarks, event_id=None):
         right_trigger = False
         left_trigger = False
         up_trigger = False
@@ -170,10 +248,7 @@ class PoseInputController:
 
         # Right trigger moves left
         if right_trigger and not self.triggered_right:
-            if self.current_key is not None:
-                keyboard.release(self.current_key)
-            keyboard.press('left')
-            self.current_key = 'left'
+            self.press('left', event_id)
             self.events.append("move_left")
             print("Triggered move_left")
             self.speak("left")
@@ -183,10 +258,7 @@ class PoseInputController:
 
         # Left trigger moves right
         if left_trigger and not self.triggered_left:
-            if self.current_key is not None:
-                keyboard.release(self.current_key)
-            keyboard.press('right')
-            self.current_key = 'right'
+            self.press('right', event_id)
             self.events.append("move_right")
             print("Triggered move_right")
             self.speak("right")
@@ -196,10 +268,7 @@ class PoseInputController:
 
         # Up trigger
         if up_trigger and not self.triggered_up:
-            if self.current_key is not None:
-                keyboard.release(self.current_key)
-            keyboard.press('up')
-            self.current_key = 'up'
+            self.press('up', event_id)
             self.events.append("move_up")
             print("Triggered move_up")
             self.speak("up")
@@ -209,10 +278,7 @@ class PoseInputController:
 
         # Down trigger
         if down_trigger and not self.triggered_down:
-            if self.current_key is not None:
-                keyboard.release(self.current_key)
-            keyboard.press('down')
-            self.current_key = 'down'
+            self.press('down', event_id)
             self.events.append("move_down")
             print("Triggered move_down")
             self.speak("down")
@@ -225,39 +291,47 @@ class PoseInputController:
         self.events.clear()
         return events
 
-    def run(self):
-        while self.cap.isOpened():
-            success, frame = self.cap.read()
-            if not success:
-                print("Ignoring empty camera frame.")
-                break
-
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
-            timestamp = int(time.time() * 1000)
-            self.landmarker.detect_async(mp_image, timestamp)
-
-            annotated_frame = rgb_frame.copy()
-            annotated_frame = self.draw_regions(annotated_frame)
-
-            if self.latest_result is not None:
-                for pose_landmarks in self.latest_result.pose_landmarks:
-                    self.check_inputs(pose_landmarks)
-                    annotated_frame = self.draw_stick_figure(annotated_frame, pose_landmarks)
-
-            display_frame = cv2.cvtColor(annotated_frame, cv2.COLOR_RGB2BGR)
-            cv2.imshow('Pose Input Detection', display_frame)
-
-            if cv2.waitKey(5) & 0xFF == ord('q'):
-                break
-
-        # Cleanup
-        self.cap.release()
-        self.landmarker.close()
-        cv2.destroyAllWindows()
-        if self.current_key is not None:
-            keyboard.release(self.current_key)
+    def run(self, display=True, adaptive=False):
+        sampler = AdaptiveSampler() if adaptive else None
+        PosePipeline(self, display=display, sampler=sampler).run()
+
+        if display:
+            cv2.destroyAllWindows()
+        self.close()
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+        if self.landmarker is not None:
+            self.landmarker.close()
+        self.release()
+        if self.sender is not None:
+            self.sender.close()
+        if self.tracer is not None:
+            self.tracer.close()
 
 if __name__ == "__main__":
-    controller = PoseInputController(single_trigger=False)
-    controller.run()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Control the maze game with your head.")
+    parser.add_argument('--no-display', action='store_true', help="Don't show the camera window")
+    parser.add_argument('--output', choices=['keyboard', 'ipc'], default='keyboard',
+                        help="ipc: send directions to maze_game.py --input ipc instead of pressing keys")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Crop to the player, downscale, and skip inference while nobody moves")
+    parser.add_argument('--trace', metavar='PATH', help="Record per-stage latency timestamps")
+    parser.add_argument('--probe-cameras', action='store_true', help="Re-check which cameras are available")
+    parser.add_argument('--model', choices=('auto',) + VARIANTS, default='auto',
+                        help="Pose model variant; auto picks the most accurate one this machine runs fast enough")
+    parser.add_argument('--refresh-model', action='store_true', help="Benchmark the models again for --model auto")
+    args = parser.parse_args()
+
+    if args.model == 'auto':
+        # Falls back to downloading the lite model if none are cached yet
+        model_path = select_model(refresh=args.refresh_model) or MODEL_PATH
+    else:
+        model_path = ensure_model(args.model)
+
+    tracer = Tracer(args.trace) if args.trace else None
+    controller = PoseInputController(single_trigger=False, output=args.output, tracer=tracer,
+                                     refresh_cameras=args.probe_cameras, model_path=model_path)
+    controller.run(display=not args.no_display, adaptive=args.adaptive)
\ No newline at end of file
@@ -0,0 +1,181 @@
+import threading
+import time
+
+import cv2
+
+
+class LatestSlot:
+    """A one-item queue between pipeline stages that only ever holds the newest value.
+
+    ``put`` never blocks: an unread value is replaced and counted in ``dropped``,
+    so a slow stage skips stale frames instead of working through a backlog.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._full = False
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._condition:
+            if self._full:
+                self.dropped += 1
+            self._item = item
+            self._full = True
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Wait for and take the newest value; None on timeout or once closed."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._full or self._closed, timeout)
+            if not self._full:
+                return None
+            item, self._item, self._full = self._item, None, False
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class Frame:
+    __slots__ = ('frame_id', 'captured_ns', 'bgr')
+
+    def __init__(self, frame_id, captured_ns, bgr):
+        self.frame_id = frame_id
+        self.captured_ns = captured_ns
+        self.bgr = bgr
+
+
+class PosePipeline:
+    """Runs a PoseInputController as camera -> inference -> gesture (-> display) stages.
+
+    Each stage runs on its own thread and hands over through a LatestSlot, so a
+    slow stage drops stale frames rather than delaying the ones behind it, and
+    gesture decisions are always made on the newest inference result. The
+    optional display stage runs on the calling thread, as OpenCV's windows
+    need the main thread on macOS.
+    """
+
+    def __init__(self, controller, display=True, sampler=None):
+        self.controller = controller
+        self.display = display
+        self.sampler = sampler  # Optional AdaptiveSampler to skip, crop and downscale frames
+        self.stop_event = threading.Event()
+        self.frames = LatestSlot()
+        self.display_frames = LatestSlot()
+        self.results = LatestSlot()
+        self.last_timestamp_ms = -1
+        self.frame_ids = {}  # timestamp_ms -> frame_id, to match results back to frames
+        self.tracer = controller.tracer
+        self.threads = [
+            threading.Thread(target=self._camera_stage, name="camera", daemon=True),
+            threading.Thread(target=self._inference_stage, name="inference", daemon=True),
+            threading.Thread(target=self._gesture_stage, name="gesture", daemon=True),
+        ]
+
+    def _camera_stage(self):
+        cap = self.controller.cap
+        frame_id = 0
+        while not self.stop_event.is_set() and cap.isOpened():
+            success, bgr = cap.read()
+            if not success:
+                print("Ignoring empty camera frame.")
+                break
+            frame = Frame(frame_id, time.monotonic_ns(), bgr)
+            if self.tracer is not None:
+                self.tracer.stamp(frame_id, 'capture', frame.captured_ns)
+            self.frames.put(frame)
+            frame_id += 1
+        self.stop()
+
+    def _inference_stage(self):
+        import mediapipe as mp  # Already loaded by the controller's landmarker by now
+
+        while not self.stop_event.is_set():
+            frame = self.frames.get(timeout=0.1)
+            if frame is None:
+                continue
+            # detect_async needs strictly increasing timestamps
+            timestamp_ms = max(frame.captured_ns // 1_000_000, self.last_timestamp_ms + 1)
+            self.last_timestamp_ms = timestamp_ms
+            rgb_frame = cv2.cvtColor(frame.bgr, cv2.COLOR_BGR2RGB)
+            if self.display:
+                self.display_frames.put(rgb_frame)
+            if self.sampler is not None:
+                rgb_frame = self.sampler.prepare(frame.bgr, timestamp_ms)
+                if rgb_frame is None:
+                    continue
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+            # Frames dropped while the graph is busy never get a result, so forget all but the newest
+            if len(self.frame_ids) > 32:
+                for old in sorted(self.frame_ids)[:-16]:
+                    self.frame_ids.pop(old, None)
+            self.frame_ids[timestamp_ms] = frame.frame_id
+            self.controller.landmarker.detect_async(mp_image, timestamp_ms)
+
+    def _on_result(self, result, timestamp_ms):
+        frame_id = self.frame_ids.pop(timestamp_ms, None)
+        if self.tracer is not None and frame_id is not None:
+            self.tracer.stamp(frame_id, 'inference')
+        if self.sampler is not None:
+            result = self.sampler.remap(result, timestamp_ms)
+            if result is None:
+                return None  # Its crop was pruned, so the landmarks can't be placed in the frame
+        self.results.put((result, frame_id))
+        return result
+
+    def _gesture_stage(self):
+        while not self.stop_event.is_set():
+            item = self.results.get(timeout=0.1)
+            if item is None:
+                continue
+            result, frame_id = item
+            for pose_landmarks in result.pose_landmarks:
+                self.controller.check_inputs(pose_landmarks, event_id=frame_id)
+
+    def _display_stage(self):
+        while not self.stop_event.is_set():
+            rgb_frame = self.display_frames.get(timeout=0.1)
+            if rgb_frame is None:
+                continue
+            annotated_frame = self.controller.draw_regions(rgb_frame.copy())
+            result = self.controller.latest_result
+            if result is not None:
+                for pose_landmarks in result.pose_landmarks:
+                    annotated_frame = self.controller.draw_stick_figure(annotated_frame, pose_landmarks)
+
+            display_frame = cv2.cvtColor(annotated_frame, cv2.COLOR_RGB2BGR)
+            cv2.imshow('Pose Input Detection', display_frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        for slot in (self.frames, self.display_frames, self.results):
+            slot.close()
+
+    def run(self):
+        self.controller.on_result = self._on_result
+        for thread in self.threads:
+            thread.start()
+        try:
+            if self.display:
+                self._display_stage()
+            else:
+                while not self.stop_event.wait(0.5):
+                    pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            for thread in self.threads:
+                thread.join()
+            self.controller.on_result = None
+        print(f"Dropped {self.frames.dropped} stale camera frames and "
+              f"{self.results.dropped} stale results")
+        if self.sampler is not None:
+            print(f"Ran inference on {self.sampler.inferred} frames, skipped {self.sampler.skipped} still ones")
@@ -0,0 +1,147 @@
+"""Replay a recorded video or landmark stream through the pose controller and benchmark it.
+
+    python pose_replay.py session.mp4                                  # as fast as possible
+    python pose_replay.py session.mp4 --realtime                       # at the video's frame rate
+    python pose_replay.py session.mp4 --record-landmarks session.jsonl
+    python pose_replay.py session.jsonl                                # thresholds only, no model
+
+Videos go through the controller's own landmarker (detect_async) and callback
+into check_inputs, one frame at a time, so the emitted events are repeatable on
+any CPU-only machine. Landmark streams skip inference and only exercise
+check_inputs, which is handy for tuning thresholds.
+"""
+import argparse
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from pose_controller_v2 import MODEL_PATH, PoseInputController
+
+
+class ReplayStats:
+    def __init__(self):
+        self.frames = 0
+        self.dropped = 0
+        self.wall_time = 0.0
+        self.latencies_ms = []
+        self.events = []  # (timestamp_ms, event)
+
+    def report(self):
+        print(f"Frames:    {self.frames} in {self.wall_time:.2f}s "
+              f"({self.frames / max(self.wall_time, 1e-9):.1f} fps), {self.dropped} without a result")
+        if self.latencies_ms:
+            p50, p90, p99 = np.percentile(self.latencies_ms, [50, 90, 99])
+            print(f"Inference: p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms, "
+                  f"max {max(self.latencies_ms):.1f} ms")
+        print(f"Events:    {len(self.events)}")
+        for timestamp_ms, event in self.events:
+            print(f"  {timestamp_ms / 1000:9.3f}s  {event}")
+
+
+def _pace(start, timestamp_ms):
+    delay = start + timestamp_ms / 1000 - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def replay_video(path, realtime=False, model_path=MODEL_PATH, record_path=None, result_timeout=5.0):
+    import mediapipe as mp  # Only videos need the model; landmark replays run without mediapipe
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    controller = PoseInputController(single_trigger=False, output='none', capture=cap, model_path=model_path)
+    stats = ReplayStats()
+    sent_ns = {}
+    answered = threading.Condition()
+    recording = open(record_path, "w") if record_path else None
+
+    def on_result(result, timestamp_ms):
+        with answered:
+            sent = sent_ns.pop(timestamp_ms, None)
+        if sent is None:
+            return result  # Arrived after result_timeout gave up on it; counted as dropped
+        latency_ms = (time.perf_counter_ns() - sent) / 1e6
+        for pose_landmarks in result.pose_landmarks:
+            controller.check_inputs(pose_landmarks)
+        with answered:
+            stats.latencies_ms.append(latency_ms)
+            stats.events.extend((timestamp_ms, event) for event in controller.get_events())
+            if recording:
+                poses = [[[lm.x, lm.y, lm.z, lm.visibility] for lm in pose] for pose in result.pose_landmarks]
+                recording.write(json.dumps({"t": timestamp_ms, "poses": poses}) + "\n")
+            answered.notify()
+        return result
+
+    controller.on_result = on_result
+    start = time.perf_counter()
+    try:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            # Timestamps come from the frame number, not the clock, so runs are repeatable
+            timestamp_ms = int(stats.frames * 1000 / fps)
+            if realtime:
+                _pace(start, timestamp_ms)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+            with answered:
+                sent_ns[timestamp_ms] = time.perf_counter_ns()
+                controller.landmarker.detect_async(mp_image, timestamp_ms)
+                stats.frames += 1
+                if not realtime:
+                    # Lock-step: the landmarker never has to drop a frame it is too busy for
+                    if not answered.wait_for(lambda: timestamp_ms not in sent_ns, result_timeout):
+                        sent_ns.pop(timestamp_ms, None)
+        if realtime:
+            with answered:
+                answered.wait_for(lambda: not sent_ns, result_timeout)
+    finally:
+        stats.wall_time = time.perf_counter() - start
+        stats.dropped = stats.frames - len(stats.latencies_ms)
+        controller.close()
+        if recording:
+            recording.close()
+    return stats
+
+
+def replay_landmarks(path, realtime=False):
+    controller = PoseInputController(single_trigger=False, output='none', capture=None, model_path=None)
+    stats = ReplayStats()
+    start = time.perf_counter()
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if realtime:
+                _pace(start, record["t"])
+            for pose in record["poses"]:
+                controller.check_inputs([SimpleNamespace(x=x, y=y, z=z, visibility=visibility)
+                                         for x, y, z, visibility in pose])
+            stats.events.extend((record["t"], event) for event in controller.get_events())
+            stats.frames += 1
+    stats.wall_time = time.perf_counter() - start
+    controller.close()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recording through the pose controller.")
+    parser.add_argument("recording", help="A video file, or a .jsonl landmark stream")
+    parser.add_argument("--realtime", action="store_true", help="Replay at the recorded pace")
+    parser.add_argument("--model", default=MODEL_PATH, help="Pose landmarker .task file")
+    parser.add_argument("--record-landmarks", metavar="JSONL",
+                        help="Save the detected landmarks so they can be replayed without the model")
+    args = parser.parse_args()
+
+    if args.recording.endswith(".jsonl"):
+        stats = replay_landmarks(args.recording, realtime=args.realtime)
+    else:
+        stats = replay_video(args.recording, realtime=args.realtime, model_path=args.model,
+                             record_path=args.record_landmarks)
+    stats.report()
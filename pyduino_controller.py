@@ -1,11 +1,15 @@
-import serial.tools.list_ports
+import queue
+import threading
 import time
 
 DEFAULT_PORT = "/dev/cu.usbserial-14230"
+_STOP = object()  # Tells an AsyncCommandWriter's thread to finish up
 
 
 class PyduinoController:
     def __init__(self, port=DEFAULT_PORT, baud_rate=115200):
+        import serial.tools.list_ports  # pyserial is only needed with a board, not for keyboard or headless runs
+
         try:
             self.arduino = serial.Serial(port, baud_rate)
         except serial.SerialException:
@@ -15,6 +19,7 @@ class PyduinoController:
             for port in ports:
                 print(port.device)
             self.arduino = None
+        self._pending = b""
 
         time.sleep(2)  # Wait for the connection to establish
 
@@ -28,11 +33,92 @@ class PyduinoController:
             response = self.arduino.readline().decode('utf-8').strip()
             print(f"Received: {response}")
 
+    def write(self, command):
+        if self.arduino is None:
+            return
+        self.arduino.write(command.encode('utf-8'))
+
+    def read_responses(self):
+        """Return the complete lines received so far, without waiting for more."""
+        if self.arduino is None:
+            return []
+        waiting = self.arduino.in_waiting
+        if waiting:
+            self._pending += self.arduino.read(waiting)
+        *lines, self._pending = self._pending.split(b"\n")
+        return [line.decode('utf-8', errors='replace').strip() for line in lines]
+
     def close(self):
         if self.arduino is None:
             return
         self.arduino.close()
 
+
+class AsyncCommandWriter:
+    """Does a PyduinoController's serial I/O on a background thread.
+
+    ``send_command`` never blocks the caller. Repeats of the last command are
+    dropped, and when a burst queues up faster than the link drains, only the
+    newest command in it is written.
+    """
+
+    def __init__(self, controller, maxsize=8, poll_interval=0.1, tracer=None):
+        self.controller = controller
+        self.tracer = tracer  # Optional latency_trace.Tracer, stamped when a write goes out
+        self.last_traced = None
+        self.poll_interval = poll_interval
+        self.queue = queue.Queue(maxsize)
+        self.last_queued = None
+        self.last_written = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def send_command(self, command, event_id=None):
+        """Queue ``command``; ``event_id`` is the traced input it follows, if any."""
+        if command == self.last_queued:
+            return
+        self.last_queued = command
+        try:
+            self.queue.put_nowait((command, event_id))
+        except queue.Full:
+            # The writer only wants the newest command anyway, so make room by dropping the oldest
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait((command, event_id))
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                batch = []
+            # Coalesce whatever else is already waiting down to the newest command
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            commands = [item for item in batch if item is not _STOP]
+
+            if commands and commands[-1][0] != self.last_written:
+                command, event_id = commands[-1]
+                self.controller.write(command)
+                self.last_written = command
+                if self.tracer is not None and event_id is not None and event_id != self.last_traced:
+                    self.tracer.stamp(event_id, 'serial')
+                    self.last_traced = event_id
+            for response in self.controller.read_responses():
+                print(f"Received: {response}")
+            if _STOP in batch:
+                return
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.controller.close()
+
 if __name__ == "__main__":
 
     arduino_controller = PyduinoController()
@@ -0,0 +1,127 @@
+import queue
+import threading
+
+import numpy as np
+import pygame
+
+from hud import render_text
+
+
+class CompletionHistogram:
+    """Histogram of completion times over ``[0, bin_width * bins)`` that widens as needed.
+
+    Bins start at zero, so when a slower time arrives doubling the bin width
+    merges neighbouring pairs exactly; nothing ever has to be re-binned from
+    the raw times.
+    """
+
+    def __init__(self, bins=50, bin_width=1.0):
+        assert bins % 2 == 0, "bins must be even so pairs can be merged"
+        self.counts = [0] * bins
+        self.bin_width = bin_width
+        self.total = 0
+
+    def _widen(self):
+        """Double the bin width, merging each pair of neighbouring bins."""
+        bins = len(self.counts)
+        merged = [a + b for a, b in zip(self.counts[::2], self.counts[1::2])]
+        self.counts = merged + [0] * (bins - len(merged))
+        self.bin_width *= 2
+
+    def add(self, time_seconds):
+        if time_seconds < 0:
+            return
+        while time_seconds >= self.bin_width * len(self.counts):
+            self._widen()
+        self.counts[int(time_seconds // self.bin_width)] += 1
+        self.total += 1
+
+    def add_many(self, times_seconds):
+        """Bin a whole array of times at once, e.g. everything already on disk."""
+        times = np.asarray(times_seconds, dtype=np.float64)
+        times = times[times >= 0]
+        if not len(times):
+            return
+        while times.max() >= self.bin_width * len(self.counts):
+            self._widen()
+        counts = np.bincount((times // self.bin_width).astype(np.intp), minlength=len(self.counts))
+        self.counts = [a + b for a, b in zip(self.counts, counts.tolist())]
+        self.total += len(times)
+
+
+class HistogramWorker(threading.Thread):
+    """Loads past completion times and keeps the histogram up to date off the game loop."""
+
+    def __init__(self, load_times, bins=50):
+        super().__init__(daemon=True)
+        self.load_times = load_times
+        self.bins = bins
+        self.histogram = None
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+
+    def run(self):
+        histogram = CompletionHistogram(self.bins)
+        try:
+            histogram.add_many(self.load_times())
+        except Exception as error:
+            # Still publish a histogram, or the end screen would say "Loading..." forever
+            print(f"Couldn't load past completion times: {error}")
+        with self.lock:
+            self.histogram = histogram
+
+        while True:
+            time_seconds = self.pending.get()
+            with self.lock:
+                self.histogram.add(time_seconds)
+
+    def add_time(self, time_seconds):
+        self.pending.put(time_seconds)
+
+    def snapshot(self):
+        """``(counts, bin_width, total)``, or None while past times are still loading."""
+        with self.lock:
+            if self.histogram is None:
+                return None
+            return list(self.histogram.counts), self.histogram.bin_width, self.histogram.total
+
+
+def draw_histogram(screen, rect, snapshot, current_time):
+    """Draw the histogram bars into ``rect`` with a marker at ``current_time``."""
+    rect = pygame.Rect(rect)
+    pygame.draw.rect(screen, pygame.Color('gray10'), rect)
+    pygame.draw.rect(screen, pygame.Color('gray40'), rect, 1)
+
+    title = render_text('Arial', 24, "Completion Times", 'white')
+    screen.blit(title, (rect.centerx - title.get_width() // 2, rect.top + 6))
+    if snapshot is None:
+        loading = render_text('Arial', 24, "Loading...", 'gray60')
+        screen.blit(loading, loading.get_rect(center=rect.center))
+        return rect
+
+    counts, bin_width, total = snapshot
+    # Trim the empty bins on the right so the bars use the full width
+    used = max((i + 1 for i, count in enumerate(counts) if count), default=1)
+    if current_time is not None:
+        used = max(used, min(len(counts), int(current_time // bin_width) + 1))
+    plot = pygame.Rect(rect.left + 10, rect.top + 36, rect.width - 20, rect.height - 66)
+    bar_width = plot.width / used
+    tallest = max(counts) or 1
+    for i, count in enumerate(counts[:used]):
+        if count:
+            height = max(1, int(plot.height * count / tallest))
+            pygame.draw.rect(screen, pygame.Color('skyblue'),
+                             (plot.left + int(i * bar_width), plot.bottom - height,
+                              max(1, int(bar_width) - 1), height))
+
+    if current_time is not None:
+        marker_x = plot.left + int(current_time / (bin_width * used) * plot.width)
+        pygame.draw.line(screen, pygame.Color('red'), (marker_x, plot.top), (marker_x, plot.bottom), 2)
+
+    low = render_text('Arial', 18, "0s", 'gray70')
+    high = render_text('Arial', 18, f"{bin_width * used:.0f}s", 'gray70')
+    runs = render_text('Arial', 18, f"{total} runs", 'gray70')
+    screen.blit(low, (plot.left, plot.bottom + 4))
+    screen.blit(high, (plot.right - high.get_width(), plot.bottom + 4))
+    screen.blit(runs, (plot.centerx - runs.get_width() // 2, plot.bottom + 4))
+    return rect
@@ -0,0 +1,44 @@
+import pygame
+
+from maze_array import WALL_CORNERS
+
+
+def wall_rect(x, y, side, tile, thickness):
+    """Collision rect of one wall, matching the rects ``Cell.get_rects()`` produces."""
+    (x0, y0), (x1, y1) = WALL_CORNERS[side]
+    left, top = (x + min(x0, x1)) * tile, (y + min(y0, y1)) * tile
+    if y0 == y1:
+        return pygame.Rect(left, top, tile, thickness)
+    return pygame.Rect(left, top, thickness, tile)
+
+
+class WallIndex:
+    """Uniform grid over the maze's wall rects, bucketed by every tile each rect overlaps.
+
+    The rects come from ``MazeGrid.wall_segments()``, so a wall shared by two
+    cells is indexed once. A collision query only looks at the buckets of the
+    tiles the moving rect covers, instead of every wall in the maze.
+    """
+
+    def __init__(self, maze_grid, tile, thickness):
+        self.tile = tile
+        self.rects = []
+        self.buckets = {}
+        for x, y, side in maze_grid.wall_segments():
+            rect = wall_rect(x, y, side, tile, thickness)
+            self.rects.append(rect)
+            for tile_key in self.tiles(rect):
+                self.buckets.setdefault(tile_key, []).append(rect)
+
+    def tiles(self, rect):
+        tile = self.tile
+        for ty in range(rect.top // tile, (rect.bottom - 1) // tile + 1):
+            for tx in range(rect.left // tile, (rect.right - 1) // tile + 1):
+                yield tx, ty
+
+    def collides(self, rect):
+        for tile_key in self.tiles(rect):
+            bucket = self.buckets.get(tile_key)
+            if bucket and rect.collidelist(bucket) != -1:
+                return True
+        return False